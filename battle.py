@@ -0,0 +1,76 @@
+from commands import AddCreature, RemoveCreature, ModifyHealth, NewRound, NewTurn, CommandLog
+from perf import timed
+
+class Battle:
+    # initiative order and counters; every change goes through a command so it can be undone
+    def __init__(self) -> None:
+        self.creatures = []
+        self.roundCounter = 0
+        self.turnCounter = 0
+        self.log = CommandLog()
+        self.listeners = []
+        self.journal = None  # see journal.py
+
+    def changed(self, command):
+        for listener in self.listeners:
+            listener(command)
+
+    @timed("battle.execute")
+    def execute(self, command):
+        # encoded first: if the journal cannot hold the command, it is not applied either
+        record = self.journal.encode(command) if self.journal is not None else None
+        command.apply(self)
+        self.log.record(command)
+        if self.journal is not None:
+            self.journal.recordCommand(record)
+        self.changed(command)
+
+    @timed("battle.undo")
+    def undo(self):
+        command = self.log.undo()
+        if command is not None:
+            command.revert(self)
+            if self.journal is not None:
+                self.journal.recordUndo()
+            self.changed(command)
+
+    @timed("battle.redo")
+    def redo(self):
+        command = self.log.redo()
+        if command is not None:
+            command.apply(self)
+            if self.journal is not None:
+                self.journal.recordRedo()
+            self.changed(command)
+
+    def restore(self, other):
+        # take over a battle rebuilt elsewhere, such as from the journal
+        self.creatures = other.creatures
+        self.roundCounter = other.roundCounter
+        self.turnCounter = other.turnCounter
+        self.log = other.log
+
+    def current(self):
+        if not self.roundCounter or not 0 <= self.turnCounter < len(self.creatures):
+            return None
+        return self.creatures[self.turnCounter]
+
+    def addCreature(self, creature):
+        creature.prepare()
+        self.execute(AddCreature(creature))
+
+    def removeCreature(self, row):
+        self.execute(RemoveCreature(self, row))
+
+    def modifyHealth(self, row, amount):
+        self.execute(ModifyHealth(self.creatures[row], amount))
+
+    def newRound(self):
+        if not len(self.creatures):
+            return
+        self.execute(NewRound())
+
+    def newTurn(self):
+        if not len(self.creatures):
+            return
+        self.execute(NewTurn(self))
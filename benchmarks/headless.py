@@ -0,0 +1,88 @@
+import importlib
+import sys
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+class RecordingCanvas:
+    # stands in for tkinter.Canvas: hands out item ids and counts calls, draws nothing
+    def __init__(self) -> None:
+        self.nextItem = 0
+        self.calls = {}
+
+    def count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def create(self, name):
+        self.count(name)
+        self.nextItem += 1
+        return self.nextItem
+
+    def create_rectangle(self, *args, **kwargs):
+        return self.create("create_rectangle")
+
+    def create_text(self, *args, **kwargs):
+        return self.create("create_text")
+
+    def create_line(self, *args, **kwargs):
+        return self.create("create_line")
+
+    def itemconfig(self, *args, **kwargs):
+        self.count("itemconfig")
+
+    def move(self, *args):
+        self.count("move")
+
+    def coords(self, *args):
+        self.count("coords")
+
+    def scale(self, *args):
+        self.count("scale")
+
+    def delete(self, *args):
+        self.count("delete")
+
+    def bind(self, *args):
+        pass
+
+    def focus_set(self):
+        pass
+
+    def reset(self):
+        self.calls = {}
+
+    def created(self):
+        return sum(count for name, count in self.calls.items() if name.startswith("create_"))
+
+class InlineRoot:
+    # stands in for tkinter.Tk: after() callbacks queue up until run() drains them
+    def __init__(self) -> None:
+        self.pending = []
+
+    def after(self, delay, callback=None, *args):
+        self.pending.append((callback, args))
+        return len(self.pending)
+
+    def after_idle(self, callback, *args):
+        return self.after(0, callback, *args)
+
+    def after_cancel(self, handle):
+        pass
+
+    def run(self):
+        while len(self.pending):
+            callback, args = self.pending.pop(0)
+            callback(*args)
+
+    def destroy(self):
+        pass
+
+def loadInterface(width=1600, height=900):
+    # a fresh interface module per call, so globals from earlier runs do not leak in
+    import interface
+    interface = importlib.reload(interface)
+    canvas, root = RecordingCanvas(), InlineRoot()
+    interface.attach(root, canvas, width, height)
+    interface.makeLayout()
+    root.run()
+    return interface, canvas, root
@@ -0,0 +1,72 @@
+import sys
+import tempfile
+import tracemalloc
+from os import chdir, getcwd
+
+from headless import loadInterface
+
+from combat import Creature, Combatant
+
+COUNT = 10000
+
+# bytes per instance, including the values it owns; raise only with a reason
+BUDGETS = {
+    "creature": 240,
+    "combatant": 170,
+    "battle row": 10000
+}
+
+def bytesPer(factory, count=COUNT):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    instances = [factory(idx) for idx in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - base - sys.getsizeof(instances)
+    tracemalloc.stop()
+    return used / count
+
+def makeCreature(idx):
+    return Creature(f"Goblin {idx}", 7, 13, 2, "enemy", 0)
+
+template = Creature("Goblin", 7, 13, 2, "enemy", 0)
+
+def makeCombatant(idx):
+    combatant = Combatant(template)
+    combatant.prepare()
+    return combatant
+
+def battleRowBytes(count=1000):
+    # widgets, hit grid entries and row bookkeeping for one creature on the battlefield
+    previous = getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        chdir(directory)
+        try:
+            interface, canvas, root = loadInterface()
+            battle = interface.appMaster.battle
+            combatants = [makeCombatant(idx) for idx in range(count)]
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            for row, combatant in enumerate(combatants):
+                battle.addBattleItemWidgets(combatant, row)
+            used = tracemalloc.get_traced_memory()[0] - base
+            tracemalloc.stop()
+        finally:
+            chdir(previous)
+    return used / count
+
+MEASUREMENTS = {
+    "creature": makeCreature,
+    "combatant": makeCombatant,
+    "battle row": None
+}
+
+def main():
+    failed = False
+    for label, factory in MEASUREMENTS.items():
+        measured = bytesPer(factory) if factory is not None else battleRowBytes()
+        verdict = "ok" if measured <= BUDGETS[label] else "OVER BUDGET"
+        failed = failed or measured > BUDGETS[label]
+        print(f"{label:<12} {measured:8.1f} bytes (budget {BUDGETS[label]}) {verdict}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
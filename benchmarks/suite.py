@@ -0,0 +1,241 @@
+import json
+import random
+import sys
+import tempfile
+from argparse import ArgumentParser
+from math import log
+from os import chdir, getcwd, makedirs, path
+from time import perf_counter
+
+from headless import loadInterface
+
+from battle import Battle
+from collection import openCollection
+from combat import Combat, Combatant, Creature
+from importer import importCompendium
+from journal import Journal, readJournal
+
+SIZES = (10, 100, 1000, 10000)
+TOLERANCE = 3.0  # timings may be this many times slower than the baseline before failing
+BASELINE = path.join(path.dirname(path.abspath(__file__)), "baseline.json")
+FACTIONS = ("player", "enemy", "NPC", "undef")
+
+def makeCreatures(n, seed=0):
+    rng = random.Random(seed)
+    return [Creature(f"Creature {idx:05d}", rng.randint(1, 100), rng.randint(8, 20), rng.randint(-2, 6), FACTIONS[idx % len(FACTIONS)], idx % 3 == 0) for idx in range(n)]
+
+def best(action, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        action()
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+def inTempDir(action):
+    # the collection store lives relative to the working directory
+    previous = getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        chdir(directory)
+        try:
+            return action()
+        finally:
+            chdir(previous)
+
+def benchNewRound(n):
+    fight = Combat()
+    for creature in makeCreatures(n):
+        fight.addCreature(creature)
+    return {"seconds": best(fight.newRound)}
+
+def benchNewTurn(n):
+    fight = Combat()
+    for creature in makeCreatures(n):
+        fight.addCreature(creature)
+    def fullRound():
+        for _ in range(n):
+            fight.newTurn()
+    return {"seconds": best(fullRound) / n}
+
+def benchSort(n):
+    creatures = makeCreatures(n)
+    for creature in creatures:
+        creature.prepare()
+    random.Random(1).shuffle(creatures)
+    return {"seconds": best(lambda: sorted(creatures))}
+
+def benchMakeCreatureList(n):
+    def run():
+        interface, canvas, root = loadInterface()
+        collection = interface.appMaster.collection
+        collection.addCreatures(makeCreatures(n), save=False)
+        def filterAll():
+            for text, faction, starred in (("", "", False), ("e 00", "", False), ("", "enemy", True), ("1", "player", False)):
+                collection.model.resultCache.clear()
+                collection.textFilter, collection.factionFilter, collection.starredOnly = text, faction, starred
+                collection.makeCreatureList()
+        return {"seconds": best(filterAll)}
+    return inTempDir(run)
+
+def benchAttemptLoad(n):
+    def run():
+        from storage import SAVEDIR
+        makedirs(SAVEDIR)
+        for creature in makeCreatures(n):
+            with open(SAVEDIR + creature.name, "w") as file:
+                file.write(f"{creature.HitPoints}\n{creature.ArmorClass}\n{creature.InititativeBonus}\n{creature.faction}\n{int(creature.starred)}\n")
+        start = perf_counter()
+        interface, canvas, root = loadInterface()
+        seconds = perf_counter() - start
+        assert len(interface.appMaster.collection.model) == n
+        return {"seconds": seconds, "calls": canvas.calls}
+    return inTempDir(run)
+
+def prepareBattle(n):
+    interface, canvas, root = loadInterface()
+    battle = interface.appMaster.battle
+    combatants = [Combatant(creature) for creature in makeCreatures(n)]
+    for combatant in combatants:
+        combatant.prepare()
+    battle.model.creatures = sorted(combatants)
+    battle.fullUpdate()
+    battle.model.newTurn()
+    canvas.reset()
+    return battle, canvas
+
+def benchBattleTurn(n):
+    def run():
+        battle, canvas = prepareBattle(n)
+        battle.model.newTurn()
+        calls = dict(canvas.calls)
+        return {"seconds": best(battle.model.newTurn), "calls": calls}
+    return inTempDir(run)
+
+def benchBattleRound(n):
+    def run():
+        battle, canvas = prepareBattle(n)
+        battle.model.newRound()
+        calls = dict(canvas.calls)
+        return {"seconds": best(battle.model.newRound, 3), "calls": calls}
+    return inTempDir(run)
+
+def benchBattleHealth(n):
+    def run():
+        battle, canvas = prepareBattle(n)
+        battle.model.modifyHealth(n // 2, -1)
+        calls = dict(canvas.calls)
+        return {"seconds": best(lambda: battle.model.modifyHealth(n // 2, -1)), "calls": calls}
+    return inTempDir(run)
+
+def benchJournalRestore(n):
+    # a long fight: every creature joins, then a few thousand turns with some damage in between
+    def run():
+        battle = Battle()
+        journal = Journal("battle.journal")
+        journal.open(battle)
+        for creature in makeCreatures(n):
+            battle.addCreature(Combatant(creature))
+        for turn in range(3000):
+            battle.newTurn()
+            if turn % 3 == 0:
+                battle.modifyHealth(turn % n, -1)
+        journal.close()
+        return {"seconds": best(lambda: readJournal("battle.journal"), 3)}
+    return inTempDir(run)
+
+def benchImport(n):
+    # a compendium export as json, every repeat imported into an empty collection
+    def run():
+        entries = [{"name": creature.name, "hit_points": creature.HitPoints, "armor_class": [{"type": "natural", "value": creature.ArmorClass}], "dexterity": 10 + 2 * creature.InititativeBonus, "desc": "x" * 200} for creature in makeCreatures(n)]
+        with open("compendium.json", "w") as file:
+            json.dump(entries, file)
+        directories = iter(range(5))
+        def importAll():
+            collection = openCollection(f"collection{next(directories)}")
+            report = importCompendium("compendium.json", collection)
+            collection.store.close()
+            assert report.imported == n
+        return {"seconds": best(importAll, 3)}
+    return inTempDir(run)
+
+CASES = {
+    "combat.newRound": benchNewRound,
+    "combat.newTurn": benchNewTurn,
+    "creature.sort": benchSort,
+    "collection.makeCreatureList": benchMakeCreatureList,
+    "collection.attemptLoad": benchAttemptLoad,
+    "battle.newTurn": benchBattleTurn,
+    "battle.newRound": benchBattleRound,
+    "battle.modifyHealth": benchBattleHealth,
+    "journal.restore": benchJournalRestore,
+    "import.compendium": benchImport
+}
+
+def runSuite(sizes, cases):
+    results = {}
+    for name in cases:
+        results[name] = {}
+        for n in sizes:
+            random.seed(n)  # initiative rolls decide how many rows move, keep them repeatable
+            results[name][str(n)] = CASES[name](n)
+            print(f"{name:<28} N={n:<6} {results[name][str(n)]['seconds'] * 1000:10.3f} ms", file=sys.stderr)
+    return results
+
+def scaling(curve):
+    # log-log slope between the smallest and largest size: ~1 is linear, ~2 quadratic
+    sizes = sorted(int(n) for n in curve)
+    if len(sizes) < 2 or curve[str(sizes[0])]["seconds"] <= 0:
+        return None
+    return log(curve[str(sizes[-1])]["seconds"] / curve[str(sizes[0])]["seconds"]) / log(sizes[-1] / sizes[0])
+
+def report(results):
+    for name, curve in results.items():
+        points = "  ".join(f"{n}:{curve[n]['seconds'] * 1000:.3f}ms" for n in curve)
+        slope = scaling(curve)
+        print(f"{name:<28} {points}" + (f"  slope {slope:.2f}" if slope is not None else ""))
+
+def compare(results, baseline, tolerance):
+    # canvas call counts are deterministic and must not grow; timings get some slack
+    failures = []
+    for name, curve in results.items():
+        for n, measured in curve.items():
+            expected = baseline.get(name, {}).get(n)
+            if expected is None:
+                continue
+            if measured["seconds"] > expected["seconds"] * tolerance:
+                failures.append(f"{name} N={n}: {measured['seconds'] * 1000:.3f}ms vs baseline {expected['seconds'] * 1000:.3f}ms")
+            for call, count in measured.get("calls", {}).items():
+                if count > expected.get("calls", {}).get(call, 0):
+                    failures.append(f"{name} N={n}: {count} {call} calls vs baseline {expected.get('calls', {}).get(call, 0)}")
+    return failures
+
+def main():
+    parser = ArgumentParser(description="Benchmark the combat core, collection filtering and rendering without a display")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", default=None, help="write the raw results as json")
+    args = parser.parse_args()
+
+    results = runSuite(args.sizes, args.cases)
+    report(results)
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=1)
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=1, sort_keys=True)
+        return 0
+    if not path.exists(args.baseline):
+        print("no baseline to compare against, run with --update-baseline")
+        return 0
+    with open(args.baseline) as file:
+        failures = compare(results, json.load(file), args.tolerance)
+    for failure in failures:
+        print("REGRESSION " + failure)
+    return 1 if len(failures) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
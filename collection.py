@@ -0,0 +1,78 @@
+from combat import Creature
+from perf import timed
+from search import NameIndex, FacetIndex, ResultCache, SortedNames
+from storage import SAVEDIR, openStore
+
+class Collection:
+    # the creature compendium with its search indexes, backed by a store
+    def __init__(self, store, caseSensitive=True, prefixFirst=False) -> None:
+        self.store = store
+        self.creatures = {}
+        self.prefixFirst = prefixFirst
+        self.nameIndex = NameIndex(caseSensitive)
+        self.sortedNames = SortedNames()
+        self.facets = FacetIndex()
+        self.resultCache = ResultCache()
+
+    def __len__(self):
+        return len(self.creatures)
+
+    def __contains__(self, name):
+        return name in self.creatures
+
+    def get(self, name):
+        return self.creatures.get(name)
+
+    @timed("collection.add")
+    def add(self, creatures, save=True):
+        for creature in creatures:
+            self.creatures[creature.name] = creature
+            self.nameIndex.add(creature.name)
+            self.facets.add(creature.name, creature.faction, creature.starred)
+        self.sortedNames.addMany([creature.name for creature in creatures])
+        self.resultCache.clear()
+        if save:
+            with self.store.batch():
+                self.store.saveMany(creatures)
+
+    def delete(self, name):
+        if self.creatures.get(name) is None:
+            return False
+        del self.creatures[name]
+        self.nameIndex.remove(name)
+        self.facets.remove(name)
+        self.sortedNames.remove(name)
+        self.resultCache.clear()
+        self.store.delete(name)
+        return True
+
+    def toggleStar(self, name):
+        creature = self.creatures[name]
+        creature.starred = creature.starred ^ 1
+        self.facets.setStarred(name, creature.starred)
+        self.resultCache.clear()
+        self.store.save(creature)
+
+    @timed("collection.view")
+    def view(self, textFilter="", factionFilter="", starredOnly=False):
+        # sorted names matching every filter, cached per filter combination
+        key = (textFilter, factionFilter, starredOnly)
+        cached = self.resultCache.get(key)
+        if cached is not None:
+            return cached
+        facet = self.facets.select(factionFilter, starredOnly)
+        if textFilter == "":
+            # names are kept sorted, so an unfiltered view is the container itself
+            result = self.sortedNames.names if facet is None else self.sortedNames.select(facet)
+        else:
+            names = self.nameIndex.search(textFilter)
+            if facet is not None:
+                names = facet & names
+            result = self.sortedNames.select(names)
+            if self.prefixFirst:
+                result = self.nameIndex.prefixFirst(result, textFilter)
+        self.resultCache.put(key, result)
+        return result
+
+def openCollection(directory=SAVEDIR, backend="sqlite", caseSensitive=True, prefixFirst=False):
+    return Collection(openStore(directory, Creature, backend), caseSensitive, prefixFirst)
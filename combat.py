@@ -1,23 +1,45 @@
+from bisect import insort
+from heapq import merge
+from operator import attrgetter
 from random import randint
 
+from dice import rollDice
+
+INITIATIVEDICE = "1d20"
+
+FACTIONRANK = {
+    "player": 0,
+    "NPC": 1,
+    "unset": 2
+}
+
 def roll(n: int):
     return randint(1, n)
 
-class Creature:
-    def __init__(self, name, hp, ac, speed, faction, starred) -> None:
-        self.name = name
-        self.HitPoints = hp
-        self.ArmorClass = ac
-        self.InititativeBonus = speed
-        self.InititativeValue = 0
-        self.faction = faction
-        self.starred = starred
+def advanceAll(creatures, rounds=1):
+    # creatures sharing a bonus keep their relative order when advanced,
+    # so a sorted list turns into a merge of one sorted run per bonus
+    runs = {}
+    for creature in creatures:
+        creature.advance(rounds)
+        runs.setdefault(creature.InititativeBonus, []).append(creature)
+    return list(merge(*runs.values(), key=attrgetter("sortKey")))
+
+class CreatureBase:
+    # initiative behaviour shared by collection creatures and battle combatants
+    __slots__ = ()
+
+    def updateSortKey(self):
+        # initiative value descending, heroes first, faster first, then by name
+        self.sortKey = (-self.InititativeValue, FACTIONRANK.get(self.faction, len(FACTIONRANK)), -self.InititativeBonus, self.name)
 
     def prepare(self):
-        self.InititativeValue = roll(20)
+        self.InititativeValue = rollDice(INITIATIVEDICE)
+        self.updateSortKey()
     
-    def advance(self):
-        self.InititativeValue += self.InititativeBonus
+    def advance(self, rounds=1):
+        self.InititativeValue += rounds * self.InititativeBonus
+        self.updateSortKey()
     
     def getAdvanced(self):
         self.advance()
@@ -27,21 +49,51 @@ class Creature:
         self.HitPoints -= damage
     
     def __lt__(self, other):
-        if self.InititativeValue != other.InititativeValue:  # might as well reverse it as a built-in
-            return self.InititativeValue > other.InititativeValue
-        if self.faction != other.faction:  # heroes go first
-            if self.faction == "player":
-                return True
-            if other.faction == "player":
-                return False
-            if self.faction == "NPC":
-                return True
-            if other.faction == "NPC":
-                return False
-            return self.faction == "unset"
-        if self.InititativeBonus != other.InititativeBonus:  # fatster goes first
-           return self.InititativeBonus > other.InititativeBonus
-        return self.name < other.name  # last resort
+        return self.sortKey < other.sortKey
+
+class Creature(CreatureBase):
+    __slots__ = ("name", "HitPoints", "ArmorClass", "InititativeBonus", "InititativeValue", "faction", "starred", "sortKey")
+
+    def __init__(self, name, hp, ac, speed, faction, starred) -> None:
+        self.name = name
+        self.HitPoints = hp
+        self.ArmorClass = ac
+        self.InititativeBonus = speed
+        self.InititativeValue = 0
+        self.faction = faction
+        self.starred = starred
+        self.updateSortKey()
+
+class Combatant(CreatureBase):
+    # a creature in battle: stats are read from a shared template, only the changing state lives here
+    __slots__ = ("template", "HitPoints", "InititativeValue", "conditions", "sortKey")
+
+    def __init__(self, template, hp=None) -> None:
+        self.template = template
+        self.HitPoints = template.HitPoints if hp is None else hp
+        self.InititativeValue = 0
+        self.conditions = ()
+        self.updateSortKey()
+
+    @property
+    def name(self):
+        return self.template.name
+
+    @property
+    def ArmorClass(self):
+        return self.template.ArmorClass
+
+    @property
+    def InititativeBonus(self):
+        return self.template.InititativeBonus
+
+    @property
+    def faction(self):
+        return self.template.faction
+
+    @property
+    def starred(self):
+        return self.template.starred
 
 class Combat:
     def __init__(self) -> None:
@@ -50,12 +102,12 @@ class Combat:
         self.turnCounter = 0
     
     def addCreature(self, creature):
-        self.creatures.append(creature)
-        self.creatures[-1].prepare()
+        creature.prepare()
+        insort(self.creatures, creature)
     
     def newRound(self):
         self.roundCounter += 1
-        self.creatures = sorted([creature.getAdvanced() for creature in self.creatures])
+        self.creatures = advanceAll(self.creatures)
     
     def newTurn(self):
         if self.turnCounter == 0:
@@ -0,0 +1,109 @@
+from bisect import insort
+
+from combat import advanceAll
+
+def startRound(battle):
+    battle.roundCounter += 1
+    battle.creatures = advanceAll(battle.creatures)
+
+def undoRound(battle):
+    # stepping every initiative back by its bonus restores the previous order exactly
+    battle.roundCounter -= 1
+    battle.creatures = advanceAll(battle.creatures, -1)
+
+class AddCreature:
+    reorders = True
+
+    def __init__(self, creature) -> None:
+        self.creature = creature  # initiative is already rolled, redo keeps it
+
+    def apply(self, battle):
+        insort(battle.creatures, self.creature)
+
+    def revert(self, battle):
+        battle.creatures.remove(self.creature)
+
+class RemoveCreature:
+    reorders = True
+
+    def __init__(self, battle, row) -> None:
+        self.row = row
+        self.creature = battle.creatures[row]
+        self.counters = (battle.roundCounter, battle.turnCounter)
+
+    def apply(self, battle):
+        battle.creatures.pop(self.row)
+        # removing the last row while it has the turn leaves the counter past the end:
+        # that turn is over and the next one starts a round
+        if battle.turnCounter > self.row:
+            battle.turnCounter -= 1
+        if not len(battle.creatures):
+            battle.roundCounter = 0
+            battle.turnCounter = 0
+
+    def revert(self, battle):
+        battle.creatures.insert(self.row, self.creature)
+        battle.roundCounter, battle.turnCounter = self.counters
+
+class ModifyHealth:
+    reorders = False  # only the hit points label changes
+
+    def __init__(self, creature, amount) -> None:
+        self.creature = creature
+        self.amount = amount
+
+    def apply(self, battle):
+        self.creature.HitPoints += self.amount
+
+    def revert(self, battle):
+        self.creature.HitPoints -= self.amount
+
+class NewRound:
+    reorders = True
+
+    def apply(self, battle):
+        startRound(battle)
+
+    def revert(self, battle):
+        undoRound(battle)
+
+class NewTurn:
+    reorders = True
+
+    def __init__(self, battle) -> None:
+        self.turn = battle.turnCounter
+        self.startsRound = self.turn >= len(battle.creatures) - 1 or battle.roundCounter == 0
+
+    def apply(self, battle):
+        if self.startsRound:
+            startRound(battle)
+            battle.turnCounter = 0
+        else:
+            battle.turnCounter += 1
+
+    def revert(self, battle):
+        if self.startsRound:
+            undoRound(battle)
+        battle.turnCounter = self.turn
+
+class CommandLog:
+    def __init__(self) -> None:
+        self.commands = []
+        self.position = 0  # commands past this point were undone and can be redone
+
+    def record(self, command):
+        del self.commands[self.position:]
+        self.commands.append(command)
+        self.position += 1
+
+    def undo(self):
+        if not self.position:
+            return None
+        self.position -= 1
+        return self.commands[self.position]
+
+    def redo(self):
+        if self.position >= len(self.commands):
+            return None
+        self.position += 1
+        return self.commands[self.position - 1]
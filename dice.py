@@ -0,0 +1,112 @@
+import random
+import re
+from functools import lru_cache
+
+np = None
+
+def loadNumpy():
+    # imported on first rollMany, plain rolls should not pay for numpy
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:  # rollMany falls back to plain python
+            return None
+        np = numpy
+    return np
+
+MAXDICE = 1000  # dice per expression, all terms together
+MAXSIDES = 10000
+
+SIGNSPACING = re.compile(r"\s*([+-])\s*")  # spaces are allowed around signs only, "8d6 3" is not 8d63
+TERM = re.compile(r"([+-])?(?:(\d*)d(\d+)(?:(kh|kl|k)(\d+))?|(\d+))")
+
+class DiceTerm:
+    def __init__(self, sign, count, sides, keep=None, kept=0) -> None:
+        self.sign = sign
+        self.count = count
+        self.sides = sides
+        self.keep = keep  # None, "kh" or "kl"
+        self.kept = min(kept, count) if keep is not None else count
+
+    def roll(self, rng):
+        dice = [rng.randint(1, self.sides) for _ in range(self.count)]
+        if self.keep is not None:
+            dice.sort(reverse=self.keep == "kh")
+            dice = dice[:self.kept]
+        return self.sign * sum(dice)
+
+    def rollMany(self, generator, n):
+        dice = generator.integers(1, self.sides + 1, size=(n, self.count))
+        if self.keep is not None:
+            dice = np.sort(dice, axis=1)
+            dice = dice[:, -self.kept:] if self.keep == "kh" else dice[:, :self.kept]
+        return self.sign * dice.sum(axis=1)
+
+class DiceExpression:
+    def __init__(self, text, terms, constant) -> None:
+        self.text = text
+        self.terms = terms
+        self.constant = constant
+
+    def roll(self, rng=None):
+        rng = rng or random
+        return self.constant + sum(term.roll(rng) for term in self.terms)
+
+    def rollMany(self, n, seed=None):
+        # a list of n totals either way, numpy only makes it faster
+        if loadNumpy() is None:
+            rng = random.Random(seed)
+            return [self.roll(rng) for _ in range(n)]
+        generator = np.random.default_rng(seed)
+        total = np.full(n, self.constant, dtype=np.int64)
+        for term in self.terms:
+            total += term.rollMany(generator, n)
+        return total.tolist()
+
+    def minimum(self):
+        return self.constant + sum(term.kept if term.sign > 0 else -term.kept * term.sides for term in self.terms)
+
+    def maximum(self):
+        return self.constant + sum(term.kept * term.sides if term.sign > 0 else -term.kept for term in self.terms)
+
+@lru_cache(maxsize=256)
+def compileDice(text):
+    # "8d6+3", "2d20kh1", "d8 - 1", "12": parsed once, evaluated many times
+    source = SIGNSPACING.sub(r"\1", text.strip()).lower()
+    if source == "":
+        raise ValueError("empty dice expression")
+    terms = []
+    constant = 0
+    dice = 0
+    position = 0
+    while position < len(source):
+        match = TERM.match(source, position)
+        if match is None or match.end() == position or (position and match.group(1) is None):
+            raise ValueError(f"bad dice expression: {text}")
+        sign, count, sides, keep, kept, number = match.groups()
+        sign = -1 if sign == "-" else 1
+        if number is not None:
+            constant += sign * int(number)
+        else:
+            if int(sides) < 1 or count == "0" or kept == "0":
+                raise ValueError(f"bad dice expression: {text}")
+            dice += int(count or 1)
+            if dice > MAXDICE or int(sides) > MAXSIDES:
+                raise ValueError(f"too many dice or sides, at most {MAXDICE}d{MAXSIDES}: {text}")
+            terms.append(DiceTerm(sign, int(count or 1), int(sides), "kh" if keep == "k" else keep, int(kept or 0)))
+        position = match.end()
+    return DiceExpression(text, tuple(terms), constant)
+
+def isDice(text):
+    try:
+        compileDice(text)
+    except ValueError:
+        return False
+    return True
+
+def rollDice(text, rng=None):
+    return compileDice(text).roll(rng)
+
+def rollDiceMany(text, n, seed=None):
+    return compileDice(text).rollMany(n, seed)
@@ -0,0 +1,302 @@
+import csv
+import json
+import re
+from argparse import ArgumentParser
+from os import path
+from time import perf_counter
+
+from combat import Creature
+
+BATCHSIZE = 1000  # creatures per store transaction
+CHUNKSIZE = 1 << 16  # characters read from a json file at a time
+MAXREJECTS = 1000  # rejects kept with their reason, the rest are only counted
+FACTIONS = {"player": "player", "enemy": "enemy", "npc": "NPC", "undef": "undef"}
+
+# creature field -> keys it is read from, first one present wins
+FIELDS = {
+    "name": ("name", "Name", "NAME"),
+    "hp": ("hit_points", "hp", "HP", "hitPoints", "Hit Points", "hit points"),
+    "ac": ("armor_class", "ac", "AC", "armorClass", "Armor Class", "armor class"),
+    "initiative": ("initiative", "initiative_bonus", "init", "Init", "Initiative", "initiativeBonus"),
+    "dexterity": ("dexterity", "dex", "DEX", "Dex", "Dexterity"),  # initiative falls back to the dex modifier
+    "faction": ("faction", "Faction")
+}
+
+LEADINGINT = re.compile(r"\s*([+-]?\d+)")
+WRAPPERKEYS = ("results", "monsters", "creatures")  # top level keys whose list is streamed entry by entry
+MAXENTRY = 1 << 20  # characters a single json value may span before the import gives up on it
+
+class JsonStream:
+    # json text read a chunk at a time, each value decoded where it starts
+    def __init__(self, file, chunkSize=CHUNKSIZE, maxEntry=MAXENTRY) -> None:
+        self.file = file
+        self.chunkSize = chunkSize
+        self.maxEntry = maxEntry
+        self.decoder = json.JSONDecoder()
+        self.buffer = file.read(chunkSize)
+        self.position = 0
+        self.eof = not len(self.buffer)
+
+    def fill(self):
+        # drops what was read already and appends the next chunk, False at the end of the file
+        if self.eof:
+            return False
+        more = self.file.read(self.chunkSize)
+        self.buffer, self.position, self.eof = self.buffer[self.position:] + more, 0, not len(more)
+        return not self.eof
+
+    def peek(self, skip=" \t\r\n"):
+        # the next character not in skip, None at the end of the file
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in skip:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                return None
+
+    def excerpt(self):
+        return repr(self.buffer[self.position:self.position + 20])
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r}, found {self.excerpt()}")
+        self.position += 1
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                end = None
+            # a value running into the end of the chunk may go on in the next one, a number for instance
+            if end is not None and (end < len(self.buffer) or self.eof):
+                break
+            if len(self.buffer) - self.position > self.maxEntry:
+                raise ValueError(f"a single json value runs past {self.maxEntry} characters")
+            if not self.fill() and end is None:
+                raise ValueError("truncated or malformed json entry")
+        self.position = end
+        if self.position > self.chunkSize:
+            self.buffer, self.position = self.buffer[self.position:], 0
+        return value
+
+    def entries(self):
+        # objects separated by commas inside a list or by newlines, up to the closing bracket or the end
+        while True:
+            char = self.peek(" \t\r\n,")
+            if char is None or char == "]":
+                return
+            if char != "{":
+                raise ValueError(f"expected an object, found {self.excerpt()}")
+            yield self.decode()
+
+def readWrapper(stream):
+    # walks the top level keys: the list under a wrapper key is streamed, anything else is decoded whole
+    stream.expect("{")
+    fields = {}
+    while True:
+        char = stream.peek(" \t\r\n,")
+        if char == "}":
+            stream.position += 1
+            break
+        if char != '"':
+            raise ValueError(f"expected a key, found {stream.excerpt()}")
+        key = stream.decode()
+        stream.expect(":")
+        if key in WRAPPERKEYS and stream.peek() == "[":
+            stream.position += 1
+            yield from stream.entries()
+            return
+        fields[key] = stream.decode()
+    # no wrapper key: a small wrapper around one list of objects under some other key, or the first of one object per line
+    lists = [value for value in fields.values() if isinstance(value, list) and len(value) and all(isinstance(entry, dict) for entry in value)]
+    if len(lists) == 1 and not any(key in fields for key in FIELDS["name"]):
+        yield from lists[0]
+    else:
+        yield fields
+    yield from stream.entries()
+
+def readJson(file, chunkSize=CHUNKSIZE, maxEntry=MAXENTRY):
+    # yields the entries of a top level array, of a {"results": [...]} style wrapper or of one object per line,
+    # holding no more than a chunk and one entry in memory
+    stream = JsonStream(file, chunkSize, maxEntry)
+    char = stream.peek()
+    if char == "[":
+        stream.position += 1
+        yield from stream.entries()
+    elif char == "{":
+        yield from readWrapper(stream)
+    else:
+        yield from stream.entries()
+
+def readCsv(file):
+    yield from csv.DictReader(file)
+
+def readEntries(filePath):
+    if path.splitext(filePath)[1].lower() == ".csv":
+        with open(filePath, "r", newline="", encoding="utf-8-sig") as file:
+            yield from readCsv(file)
+    else:
+        with open(filePath, "r", encoding="utf-8-sig") as file:
+            yield from readJson(file)
+
+def toInt(value):
+    # 15, "15", "15 (natural armor)", "45 (6d10+12)", [{"value": 15}] and {"value": 15} all read as 15
+    if isinstance(value, list):
+        value = value[0] if len(value) else None
+    if isinstance(value, dict):
+        value = value.get("value")
+    if isinstance(value, bool) or value is None:
+        raise ValueError("missing")
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = LEADINGINT.match(str(value))
+    if match is None:
+        raise ValueError(f"not a number: {value!r}")
+    return int(match.group(1))
+
+class FieldMap:
+    def __init__(self, mapping=None, faction="enemy") -> None:
+        self.fields = dict(FIELDS)
+        for field, key in (mapping or {}).items():
+            if field not in self.fields:
+                raise ValueError(f"unknown field {field}, expected one of {', '.join(FIELDS)}")
+            self.fields[field] = (key,)
+        self.faction = faction
+
+    def lookup(self, entry, field):
+        for key in self.fields[field]:
+            value = entry.get(key)
+            if value is not None and value != "":
+                return value
+        return None
+
+    def makeCreature(self, entry):
+        if not isinstance(entry, dict):
+            raise ValueError("entry is not an object")
+        name = self.lookup(entry, "name")
+        if not isinstance(name, str) or name.strip() == "":
+            raise ValueError("no name")
+        name = name.strip()
+        try:
+            hp = toInt(self.lookup(entry, "hp"))
+        except ValueError as error:
+            raise ValueError(f"hit points {error}")
+        if hp < 1:
+            raise ValueError("hit points below 1")
+        try:
+            ac = toInt(self.lookup(entry, "ac"))
+        except ValueError as error:
+            raise ValueError(f"armor class {error}")
+        initiative = self.lookup(entry, "initiative")
+        dexterity = self.lookup(entry, "dexterity")
+        try:
+            if initiative is not None:
+                initiative = toInt(initiative)
+            elif dexterity is not None:
+                initiative = (toInt(dexterity) - 10) // 2
+            else:
+                initiative = 0
+        except ValueError as error:
+            raise ValueError(f"initiative {error}")
+        faction = FACTIONS.get(str(self.lookup(entry, "faction") or "").strip().lower(), self.faction)
+        return Creature(name, hp, ac, initiative, faction, 0)
+
+class ImportReport:
+    def __init__(self) -> None:
+        self.imported = 0
+        self.rejected = 0
+        self.rejects = []  # (entry number, name, reason)
+        self.error = None
+        self.seconds = 0.0
+        self.done = False
+
+    def reject(self, number, entry, reason):
+        self.rejected += 1
+        if len(self.rejects) < MAXREJECTS:
+            name = entry.get("name", entry.get("Name", "")) if isinstance(entry, dict) else ""
+            self.rejects.append((number, name, reason))
+
+    def summary(self):
+        text = f"imported {self.imported}, rejected {self.rejected} in {self.seconds:.2f}s"
+        return text if self.error is None else f"{text}, stopped early: {self.error}"
+
+    def writeRejects(self, filePath):
+        with open(filePath, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(("entry", "name", "reason"))
+            writer.writerows(self.rejects)
+
+def importSteps(filePath, collection, fieldMap=None, batchSize=BATCHSIZE):
+    # adds one batch per step, so a ui can keep handling events in between and redraw once at the end
+    fieldMap = fieldMap or FieldMap()
+    report = ImportReport()
+    start = perf_counter()
+    batch = {}  # by name, a later entry replaces an earlier one
+    try:
+        for number, entry in enumerate(readEntries(filePath), 1):
+            try:
+                creature = fieldMap.makeCreature(entry)
+            except ValueError as error:
+                report.reject(number, entry, str(error))
+                continue
+            batch[creature.name] = creature
+            if len(batch) >= batchSize:
+                collection.add(list(batch.values()))
+                report.imported += len(batch)
+                batch = {}
+                report.seconds = perf_counter() - start
+                yield report
+    except (ValueError, csv.Error, UnicodeDecodeError) as error:
+        report.error = str(error)
+    if len(batch):
+        collection.add(list(batch.values()))
+        report.imported += len(batch)
+    report.seconds = perf_counter() - start
+    report.done = True
+    yield report
+
+def importCompendium(filePath, collection, fieldMap=None, batchSize=BATCHSIZE):
+    report = None
+    for report in importSteps(filePath, collection, fieldMap, batchSize):
+        pass
+    return report
+
+def parseMapping(pairs):
+    mapping = {}
+    for pair in pairs:
+        field, separator, key = pair.partition("=")
+        if not separator:
+            raise ValueError(f"expected field=key, got {pair}")
+        mapping[field] = key
+    return mapping
+
+def main():
+    from collection import openCollection
+    from storage import SAVEDIR
+
+    parser = ArgumentParser(description="Import creatures from a JSON or CSV compendium into the collection")
+    parser.add_argument("file")
+    parser.add_argument("--map", nargs="+", default=[], metavar="FIELD=KEY", help=f"read a field from another key, fields: {', '.join(FIELDS)}")
+    parser.add_argument("--faction", default="enemy", choices=sorted(set(FACTIONS.values())), help="faction for entries without one")
+    parser.add_argument("--rejects", default=None, help="write rejected entries and why to this csv file")
+    parser.add_argument("--backend", default="sqlite", choices=("sqlite", "files"))
+    args = parser.parse_args()
+
+    try:
+        fieldMap = FieldMap(parseMapping(args.map), args.faction)
+    except ValueError as error:
+        parser.error(str(error))
+    collection = openCollection(SAVEDIR, args.backend)
+    report = importCompendium(args.file, collection, fieldMap)
+    collection.store.close()
+    print(report.summary())
+    for number, name, reason in report.rejects[:10]:
+        print(f"  entry {number} {name}: {reason}")
+    if args.rejects is not None:
+        report.writeRejects(args.rejects)
+
+if __name__ == "__main__":
+    main()
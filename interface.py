@@ -1,9 +1,25 @@
-from tkinter import Tk, Canvas
-from os import path, makedirs, listdir, remove
-from copy import deepcopy
-from random import randint
-
-SAVEDIR = "./DnD-Init-Tracker-Resources/"
+from os import makedirs, path
+from time import time
+
+from battle import Battle
+from collection import openCollection
+from combat import Creature, Combatant
+from dice import isDice, rollDice
+from importer import importSteps
+from journal import JOURNALNAME, Journal, loadJournal
+from perf import profiler, timed, CountingCanvas
+from storage import SAVEDIR
+
+STOREBACKEND = "sqlite"
+LOADBATCH = 250
+SEARCHCASESENSITIVE = True
+SEARCHPREFIXFIRST = False
+PROFILE = False  # record timings from launch, F12 toggles the overlay either way
+HUDINTERVAL = 500  # ms
+TRACEDIR = "traces"
+JOURNALDIR = "battle"
+SERVEHOST = "0.0.0.0"
+SERVEPORT = None  # set to a port to publish the battle to player displays, see server.py
 
 BGCOLOR = "#1e1e1e"
 HLCOLOR = "#3e3e3e"
@@ -21,55 +37,13 @@ FACTIONMAP = {
     "undef": HLCOLOR
 }
 
-def roll(n: int):
-    return randint(1, n)
-
-class Creature:
-    def __init__(self, name, hp, ac, speed, faction, starred) -> None:
-        self.name = name
-        self.HitPoints = hp
-        self.ArmorClass = ac
-        self.InititativeBonus = speed
-        self.InititativeValue = 0
-        self.faction = faction
-        self.starred = starred
-
-    def prepare(self):
-        self.InititativeValue = roll(20)
-    
-    def advance(self):
-        self.InititativeValue += self.InititativeBonus
-    
-    def getAdvanced(self):
-        self.advance()
-        return self
-    
-    def damage(self, damage):
-        self.HitPoints -= damage
-    
-    def __lt__(self, other):
-        if self.InititativeValue != other.InititativeValue:  # might as well reverse it as a built-in
-            return self.InititativeValue > other.InititativeValue
-        if self.faction != other.faction:  # heroes go first
-            if self.faction == "player":
-                return True
-            if other.faction == "player":
-                return False
-            if self.faction == "NPC":
-                return True
-            if other.faction == "NPC":
-                return False
-            return self.faction == "unset"
-        if self.InititativeBonus != other.InititativeBonus:  # fatster goes first
-           return self.InititativeBonus > other.InititativeBonus
-        return self.name < other.name  # last resort
-
-root = Tk()
-root.title("D'n'D Combat Assistant | Ver 0.1.0")
-root.geometry("1600x900")
-root.update()
-
-WUNIT, HUNIT = root.winfo_width() / 20, root.winfo_height() / 20
+WIDTH, HEIGHT = 1600, 900
+
+# set by attach(), either from main() or by a headless harness
+root = None
+canvas = None
+
+WUNIT, HUNIT = WIDTH / 20, HEIGHT / 20
 TRANSPOSE = HUNIT / WUNIT
 
 MAINFONT = "Consolas 16"
@@ -82,10 +56,21 @@ SYMBOLMAP = {
     "minus": "-"
 }
 
-canvas = Canvas(width=root.winfo_width(), height=root.winfo_height(), bg="#1e1e1e")
-canvas.pack(fill="both", expand=True)
+def editText(text, keysim, char):
+    if len(char) == 1 and ord(char) > 20:
+        return text + char
+    elif keysim == "BackSpace" and len(text):
+        return text[:-1]
+    elif keysim == "Delete" and len(text):
+        return ""
+    elif SYMBOLMAP.get(keysim) is not None:
+        return text + SYMBOLMAP[keysim]
+    return text
 
 class WidgetBase:
+    canvasItems = ("box",)
+    __slots__ = ("rawEdges", "edges", "defaultFill", "defaultOutline", "box", "ghost", "tags")
+
     def __init__(self, x0, y0, width, height) -> None:
         self.rawEdges = (x0, y0, x0 + width, y0 + height)
         self.edges = (x0, y0, x0 + width, y0 + height)
@@ -93,6 +78,8 @@ class WidgetBase:
         self.defaultFill = ""
         self.defaultOutline = "white"
         self.box = None
+        self.ghost = False
+        self.tags = ()  # canvas tags, so a whole group can be deleted in one call
     
     def update(self):
         x0, y0, x1, y1 = self.rawEdges
@@ -100,13 +87,24 @@ class WidgetBase:
 
     def draw(self):
         self.erase()
-        self.box = canvas.create_rectangle(self.edges, fill=self.defaultFill, outline=self.defaultOutline)
+        self.box = canvas.create_rectangle(self.edges, fill=self.defaultFill, outline=self.defaultOutline, tags=self.tags)
     
     def erase(self):
         if self.box is not None:
             canvas.delete(self.box)
             self.box = None
-    
+
+    def forget(self):
+        # the items are already gone from the canvas, through a tag delete
+        for attribute in self.canvasItems:
+            setattr(self, attribute, None)
+
+    def shiftEdges(self, dx, dy):
+        x0, y0, x1, y1 = self.rawEdges
+        self.rawEdges = (x0 + dx, y0 + dy, x1 + dx, y1 + dy)
+        self.update()
+        hitGrid.reindex(self)
+
     def cursorIn(self, x, y):
         x0, y0, x1, y1 = self.edges
         return (x0 < x and x < x1 and y0 < y and y < y1)
@@ -132,13 +130,19 @@ class WidgetBase:
     def input(self, keysim, char):
         pass
 
+    def inputMany(self, keys):
+        for keysim, char in keys:
+            self.input(keysim, char)
+
 class LineWidget(WidgetBase):
+    __slots__ = ()
+
     def __init__(self, x0, y0, x1, y1) -> None:
         super().__init__(x0, y0, x1 - x0, y1 - y0)
     
     def draw(self):
         self.erase()
-        self.box = canvas.create_line(self.edges, fill=self.defaultOutline)
+        self.box = canvas.create_line(self.edges, fill=self.defaultOutline, tags=self.tags)
       
     def cursorIn(self, x, y):
         return False
@@ -156,6 +160,9 @@ class LineWidget(WidgetBase):
         pass
     
 class BorderedLabel(WidgetBase):
+    canvasItems = ("box", "textImage")
+    __slots__ = ("text", "textImage", "outlined")
+
     def __init__(self, x0, y0, width, height, label, outlined=True) -> None:
         super().__init__(x0, y0, width, height)
         self.text = label
@@ -164,10 +171,10 @@ class BorderedLabel(WidgetBase):
     
     def draw(self):
         self.erase()
-        self.box = canvas.create_rectangle(self.edges, fill=self.defaultFill, outline = self.defaultOutline if self.outlined else "")
+        self.box = canvas.create_rectangle(self.edges, fill=self.defaultFill, outline = self.defaultOutline if self.outlined else "", tags=self.tags)
         x0, y0, x1, y1 = self.edges
         width, height = x1 - x0, y1 - y0
-        self.textImage = canvas.create_text(x0 + width / 2, y0 + height / 2, anchor="center", text=self.text, fill="white", font=MAINFONT)
+        self.textImage = canvas.create_text(x0 + width / 2, y0 + height / 2, anchor="center", text=self.text, fill="white", font=MAINFONT, tags=self.tags)
     
     def erase(self):
         super().erase()
@@ -188,10 +195,23 @@ class BorderedLabel(WidgetBase):
         pass
     
     def set(self, value):
-        self.text = value
-        self.draw()
+        value = str(value)
+        if self.textImage is None:
+            self.text = value
+            self.draw()
+        elif value != self.text:
+            self.text = value
+            canvas.itemconfig(self.textImage, text=self.text)
+
+    def setFill(self, color):
+        self.defaultFill = color
+        if self.box is not None:
+            canvas.itemconfig(self.box, fill=self.defaultFill)
 
 class ToggleableLabel(WidgetBase):
+    canvasItems = ("box", "textImage")
+    __slots__ = ("text", "textImage", "onColor", "currentFill", "on", "script")
+
     def __init__(self, x0, y0, width, height, label, color, script=None) -> None:
         super().__init__(x0, y0, width, height)
         self.text = label
@@ -203,10 +223,10 @@ class ToggleableLabel(WidgetBase):
     
     def draw(self):
         self.erase()
-        self.box = canvas.create_rectangle(self.edges, fill=self.currentFill, outline=self.defaultOutline)
+        self.box = canvas.create_rectangle(self.edges, fill=self.currentFill, outline=self.defaultOutline, tags=self.tags)
         x0, y0, x1, y1 = self.edges
         width, height = x1 - x0, y1 - y0
-        self.textImage = canvas.create_text(x0 + width / 2, y0 + height / 2, anchor="center", text=self.text, fill="white", font=MAINFONT)
+        self.textImage = canvas.create_text(x0 + width / 2, y0 + height / 2, anchor="center", text=self.text, fill="white", font=MAINFONT, tags=self.tags)
 
     def erase(self):
         super().erase()
@@ -230,11 +250,18 @@ class ToggleableLabel(WidgetBase):
         return self.on
 
     def set(self, value):
-        self.on = value
+        changed = bool(value) != self.on
+        self.on = bool(value)
         self.currentFill = self.onColor if self.on else self.defaultFill
-        self.draw()
+        if self.box is None:
+            self.draw()
+        elif changed:
+            canvas.itemconfig(self.box, fill=self.currentFill)
 
 class Button(WidgetBase):
+    canvasItems = ("box", "textImage")
+    __slots__ = ("text", "textImage", "script")
+
     def __init__(self, x0, y0, width, height, label, script) -> None:
         super().__init__(x0, y0, width, height)
         self.text = label
@@ -245,7 +272,7 @@ class Button(WidgetBase):
         super().draw()
         x0, y0, x1, y1 = self.edges
         width, height = x1 - x0, y1 - y0
-        self.textImage = canvas.create_text(x0 + width / 2, y0 + height / 2, anchor="center", text=self.text, fill="white", font=MAINFONT)
+        self.textImage = canvas.create_text(x0 + width / 2, y0 + height / 2, anchor="center", text=self.text, fill="white", font=MAINFONT, tags=self.tags)
 
     def erase(self):
         super().erase()
@@ -259,7 +286,15 @@ class Button(WidgetBase):
     def deselect(self):
         pass
 
+    def set(self, value):
+        self.text = value
+        if self.textImage is not None:
+            canvas.itemconfig(self.textImage, text=self.text)
+
 class TextField(WidgetBase):
+    canvasItems = ("box", "textImage")
+    __slots__ = ("text", "textImage")
+
     def __init__(self, x0, y0, width, height) -> None:
         super().__init__(x0, y0, width, height)
         self.text = ""
@@ -269,7 +304,7 @@ class TextField(WidgetBase):
         super().draw()
         x0, y0, x1, y1 = self.edges
         width, height = x1 - x0, y1 - y0
-        self.textImage = canvas.create_text(x0 + width / 2, y0 + height / 2, anchor="center", text=self.text, fill="white", font=MAINFONT)
+        self.textImage = canvas.create_text(x0 + width / 2, y0 + height / 2, anchor="center", text=self.text, fill="white", font=MAINFONT, tags=self.tags)
 
     def erase(self):
         super().erase()
@@ -278,14 +313,11 @@ class TextField(WidgetBase):
             self.textImage = None
 
     def input(self, keysim, char):
-        if len(char) == 1 and ord(char) > 20:
-            self.text = self.text + char
-        elif keysim == "BackSpace" and len(self.text):
-            self.text = self.text[:-1]
-        elif keysim == "Delete" and len(self.text):
-            self.text = ""
-        elif SYMBOLMAP.get(keysim) is not None:
-            self.text += SYMBOLMAP[keysim]
+        self.inputMany(((keysim, char),))
+
+    def inputMany(self, keys):
+        for keysim, char in keys:
+            self.text = editText(self.text, keysim, char)
         if self.textImage is not None:
             canvas.itemconfig(self.textImage, text=self.text)
 
@@ -293,15 +325,22 @@ class TextField(WidgetBase):
         return self.text
 
     def set(self, value):
-        self.text = value
-        self.draw()
+        if self.textImage is None:
+            self.text = value
+            self.draw()
+        elif value != self.text:
+            self.text = value
+            canvas.itemconfig(self.textImage, text=self.text)
 
 class NamedTextLine(WidgetBase):
+    canvasItems = ("box", "underline", "textImage", "underTextImage")
+    __slots__ = ("text", "textmode", "undertext", "undertextmode", "underline", "textImage", "underTextImage", "script")
+
     def __init__(self, x0, y0, width, name, textmode="sw", subtextmode="nw", script=None) -> None:
         self.defaultFill = ""
         self.defaultOutline = "white"
         self.rawEdges = (x0, y0 -  0.5, x0 + width, y0)
-        self.edges = (x0, y0 -  0.5, x0 + width, y0)
+        self.update()
         self.text = ""
         self.textmode = textmode
         self.undertext = name
@@ -311,15 +350,17 @@ class NamedTextLine(WidgetBase):
         self.textImage = None
         self.underTextImage = None
         self.script = script
+        self.ghost = False
+        self.tags = ()
     
     def draw(self):
         self.erase()
         x0, y0, x1, y1 = self.edges
         width, height = x1 - x0, y1 - y0
-        self.box = canvas.create_rectangle(self.edges, fill="", outline="")
-        self.underline = canvas.create_line(x0, y1, x0 + width, y1, fill="white")
-        self.textImage = canvas.create_text(x0 + (2 if self.textmode == "sw" else (width / 2)), y1, anchor=self.textmode, text=self.text, fill="white", font=DIALFONT)
-        self.underTextImage = canvas.create_text(x0 + (2 if self.undertextmode == "nw" else (width / 2)), y1, anchor=self.undertextmode, text=self.undertext, fill="white", font=SUBFONT)
+        self.box = canvas.create_rectangle(self.edges, fill="", outline="", tags=self.tags)
+        self.underline = canvas.create_line(x0, y1, x0 + width, y1, fill="white", tags=self.tags)
+        self.textImage = canvas.create_text(x0 + (2 if self.textmode == "sw" else (width / 2)), y1, anchor=self.textmode, text=self.text, fill="white", font=DIALFONT, tags=self.tags)
+        self.underTextImage = canvas.create_text(x0 + (2 if self.undertextmode == "nw" else (width / 2)), y1, anchor=self.undertextmode, text=self.undertext, fill="white", font=SUBFONT, tags=self.tags)
 
     def erase(self):
         if self.box is not None:
@@ -342,14 +383,12 @@ class NamedTextLine(WidgetBase):
         canvas.itemconfig(self.underline, fill=self.defaultOutline)
 
     def input(self, keysim, char):
-        if len(char) == 1 and ord(char) > 20:
-            self.text = self.text + char
-        elif keysim == "BackSpace" and len(self.text):
-            self.text = self.text[:-1]
-        elif keysim == "Delete" and len(self.text):
-            self.text = ""
-        elif SYMBOLMAP.get(keysim) is not None:
-            self.text += SYMBOLMAP[keysim]
+        self.inputMany(((keysim, char),))
+
+    def inputMany(self, keys):
+        # a burst of typing is one text update and one script call
+        for keysim, char in keys:
+            self.text = editText(self.text, keysim, char)
         if self.textImage is not None:
             canvas.itemconfig(self.textImage, text=self.text)
         if self.script is not None:
@@ -359,15 +398,22 @@ class NamedTextLine(WidgetBase):
         return self.text
 
     def set(self, value):
-        self.text = value
-        self.draw()
+        if self.textImage is None:
+            self.text = value
+            self.draw()
+        elif value != self.text:
+            self.text = value
+            canvas.itemconfig(self.textImage, text=self.text)
 
 class ColorBox(WidgetBase):
+    canvasItems = ("box", "checkBox")
+    __slots__ = ("colors", "current", "checkBox")
+
     def __init__(self, x0, y0, width, height, colors=["", "white"]) -> None:
         super().__init__(x0, y0, width, height)
         self.colors = colors
         self.current = 0
-        self.checkBox = canvas.create_rectangle(x0 + 5, y0 + 5, x0 + width - 4, y0 + height - 4, fill=self.colors[self.current], outline="")
+        self.checkBox = canvas.create_rectangle(x0 + 5, y0 + 5, x0 + width - 4, y0 + height - 4, fill=self.colors[self.current], outline="", tags=self.tags)
     
     def select(self):
         self.current = (self.current + 1) % len(self.colors)
@@ -378,13 +424,100 @@ class ColorBox(WidgetBase):
 
     def set(self, value):
         self.current = value
-        self.draw()
+        if self.checkBox is None:
+            self.draw()
+        else:
+            canvas.itemconfig(self.checkBox, fill=self.colors[self.current])
+
+class HitGrid:
+    # uniform grid over widget edges in layout units, so window resizes never invalidate it
+    def __init__(self, cellSize=1.0) -> None:
+        self.cellSize = cellSize
+        self.cells = {}
+        self.widgetCells = {}
+
+    def span(self, low, high):
+        # cells touched by [low, high), an edge exactly on a cell border stays out of the next cell
+        return range(int(low // self.cellSize), int(-(-high // self.cellSize)))
+
+    def insert(self, widget):
+        self.remove(widget)
+        x0, y0, x1, y1 = widget.rawEdges
+        self.widgetCells[widget] = (x0, y0, x1, y1)
+        for cx in self.span(x0, x1):
+            for cy in self.span(y0, y1):
+                self.cells.setdefault((cx, cy), []).append(widget)
+
+    def remove(self, widget):
+        edges = self.widgetCells.pop(widget, None)
+        if edges is None:
+            return
+        x0, y0, x1, y1 = edges
+        for cx in self.span(x0, x1):
+            for cy in self.span(y0, y1):
+                cell = self.cells[(cx, cy)]
+                cell.remove(widget)
+                if not len(cell):
+                    del self.cells[(cx, cy)]
+
+    def reindex(self, widget):
+        if widget in self.widgetCells:
+            self.insert(widget)
+
+    def find(self, x, y):
+        cell = self.cells.get((int(x / WUNIT // self.cellSize), int(y / HUNIT // self.cellSize)))
+        if cell is None:
+            return None
+        for widget in reversed(cell):  # latest drawn is on top
+            if not widget.ghost and widget.cursorIn(x, y):
+                return widget
+        return None
+
+class WidgetRegistry:
+    # every live widget in drawing order, with the ones sharing a canvas tag grouped for bulk removal
+    def __init__(self) -> None:
+        self.widgets = {}
+        self.groups = {}
+
+    def __iter__(self):
+        return iter(self.widgets)
+
+    def __len__(self):
+        return len(self.widgets)
+
+    def __contains__(self, widget):
+        return widget in self.widgets
 
-widgets = []
-ghosts = []
+    def add(self, widget, group=None):
+        self.widgets[widget] = group
+        if group is not None:
+            self.groups.setdefault(group, {})[widget] = None
+
+    def removeGroup(self, group):
+        members = self.groups.pop(group, {})
+        for widget in members:
+            del self.widgets[widget]
+        return list(members)
+
+widgets = WidgetRegistry()
+hitGrid = HitGrid()
 focusedWidget = None
 selectedWidget = None
 
+def registerWidget(widget, group=None):
+    widgets.add(widget, group)
+    hitGrid.insert(widget)
+
+def forgetGroup(group):
+    for widget in widgets.removeGroup(group):
+        widget.forget()
+        hitGrid.remove(widget)
+
+def eraseGroup(group):
+    # one canvas call for the whole group instead of one per item
+    canvas.delete(group)
+    forgetGroup(group)
+
 class Master():
     def __init__(self) -> None:
         self.editor = None
@@ -403,7 +536,7 @@ class Master():
     
     def forwardCreatureToBattle(self, creature):
         if self.battle is not None and creature is not None:
-            self.battle.addCreature(deepcopy(creature))
+            self.battle.addCreature(Combatant(creature))
 
 appMaster = Master()
 
@@ -412,9 +545,8 @@ class WidgetManagerBase:
         self.widgets = {}
     
     def addWidget(self, widget, tag):
-        global widgets
         self.widgets[tag] = widget
-        widgets.append(widget)
+        registerWidget(widget)
     
     def getWidgetData(self, tag):
         widget = self.widgets.get(tag)
@@ -475,6 +607,8 @@ class EditorManager(WidgetManagerBase):
         if name == "" or hp == "" or ac == "" or init == "":
             print("some data missing")
             return None
+        if not hp.isdigit() and isDice(hp):  # "2d8+2" rolls this creature's hit points
+            hp = str(max(1, rollDice(hp)))
         if (not hp.isdigit()) or (not ac.isdigit()):
             print("hp or ac is nan")
             return None
@@ -511,8 +645,9 @@ class CollectionManager(WidgetManagerBase):
     def __init__(self) -> None:
         super().__init__()
 
-        self.creatureCollection = {}
+        self.model = openCollection(SAVEDIR, STOREBACKEND, SEARCHCASESENSITIVE, SEARCHPREFIXFIRST)
         self.collectionStringWidgets = []
+        self.collectionSlotNames = []
 
         self.creatureList = []
         self.creatureListShift = 0
@@ -539,61 +674,62 @@ class CollectionManager(WidgetManagerBase):
         filterStarred = ToggleableLabel( 4.5, 19.0,  1.5,  1.0, "Starred", STARCOLOR, lambda : self.fullUpdate())
         self.addWidget(filterStarred, "filterStarred")
 
+        for slot in range(self.creatureLimit):
+            self.addCollectionItemWidgets(slot)
+
         self.attemptLoad()
     
     def attemptLoad(self):
-        if not path.exists(SAVEDIR):
-            makedirs(SAVEDIR)
-        for name in listdir(SAVEDIR[:-1]):
-            with open(SAVEDIR + name, "r") as file:
-                try:
-                    hp = int(file.readline().strip())
-                    ac = int(file.readline().strip())
-                    init = int(file.readline().strip())
-                    faction = file.readline().strip()
-                    starred = int(file.readline().strip())
-                    creature = Creature(name, int(hp), int(ac), int(init), faction, starred)
-                    self.addCreature(creature, save=False)
-                except Exception:
-                    continue
-    
-    def addCollectionItemWidgets(self, name="", starred=False):
+        # the list fills in after the mainloop starts, one redraw per batch
+        root.after(0, self.loadBatch, self.model.store.loadBatches(LOADBATCH))
+
+    @timed("collection.loadBatch")
+    def loadBatch(self, batches):
+        creatures = next(batches, None)
+        if creatures is None:
+            return
+        self.addCreatures([creature for creature in creatures if creature.name not in self.model], save=False)
+        root.after(1, self.loadBatch, batches)
+    
+    def addCollectionItemWidgets(self, slot):
+        # slots are built once and rebound to whatever creature scrolls into them
         hBase = 7
-        hShift = len(self.collectionStringWidgets)
-        starredMark = ToggleableLabel( 0.25,  (hBase + hShift + 0.5),  0.75 * TRANSPOSE,  0.75, "*", STARCOLOR, lambda : self.updateCreatureStar(self.getNameByRow(hShift)))
-        if starred:
-            starredMark.set(True)
-        starredMark.draw()
-        widgets.append(starredMark)
-        nameField = Button( 0.35 + 0.75 * TRANSPOSE,  (hBase + hShift + 0.5),  4.55 - (0.35 + 0.75 * TRANSPOSE),  0.75, name, lambda : appMaster.setEtitorToCreatue(self.creatureCollection[self.getNameByRow(hShift)]))
-        nameField.draw()
-        widgets.append(nameField)
-        discardButton = Button( 4.65,  (hBase + hShift + 0.5),  0.5,  0.75, "X", lambda : self.deleteCreature(self.getNameByRow(hShift)))
-        discardButton.draw()
-        widgets.append(discardButton)
-        toCombatButton = Button( 5.25,  (hBase + hShift + 0.5),  0.5,  0.75, ">>>", lambda : appMaster.forwardCreatureToBattle(self.creatureCollection[self.getNameByRow(hShift)]))
-        toCombatButton.draw()
-        widgets.append(toCombatButton)
-        self.collectionStringWidgets.append({
+        starredMark = ToggleableLabel( 0.25,  (hBase + slot + 0.5),  0.75 * TRANSPOSE,  0.75, "*", STARCOLOR, lambda : self.updateCreatureStar(self.getNameByRow(slot)))
+        nameField = Button( 0.35 + 0.75 * TRANSPOSE,  (hBase + slot + 0.5),  4.55 - (0.35 + 0.75 * TRANSPOSE),  0.75, "", lambda : appMaster.setEtitorToCreatue(self.model.get(self.getNameByRow(slot))))
+        discardButton = Button( 4.65,  (hBase + slot + 0.5),  0.5,  0.75, "X", lambda : self.deleteCreature(self.getNameByRow(slot)))
+        toCombatButton = Button( 5.25,  (hBase + slot + 0.5),  0.5,  0.75, ">>>", lambda : appMaster.forwardCreatureToBattle(self.model.get(self.getNameByRow(slot))))
+        string = {
             "isStarred": starredMark,
             "name": nameField,
             "discard": discardButton,
             "toCombat": toCombatButton
-        })
-    
+        }
+        tags = ("collection-rows", f"collection-slot-{slot}")
+        for widget in string.values():
+            widget.tags = tags
+        self.collectionStringWidgets.append(string)
+        self.collectionSlotNames.append(None)
+
+    def bindCollectionItemWidgets(self, slot, name):
+        string = self.collectionStringWidgets[slot]
+        if name is None:
+            if self.collectionSlotNames[slot] is not None:
+                eraseGroup(f"collection-slot-{slot}")
+            self.collectionSlotNames[slot] = None
+            return
+        if self.collectionSlotNames[slot] is None:
+            for widget in string.values():
+                widget.update()
+                widget.draw()
+                registerWidget(widget, f"collection-slot-{slot}")
+        self.collectionSlotNames[slot] = name
+        if string["name"].text != name:
+            string["name"].set(name)
+        string["isStarred"].set(self.model.get(name).starred)
+
     def getNameByRow(self, row):
-        if row >= min(11, len(self.creatureList)):
-            return None
-        name = self.collectionStringWidgets[row]["name"].text
-        return name
+        return self.collectionSlotNames[row]
 
-    def eraseList(self):
-        for string in self.collectionStringWidgets:
-            for widget in string.values():
-                widget.erase()
-                widgets.pop(widgets.index(widget))
-        self.collectionStringWidgets = []
-    
     def updateFilters(self):
         self.textFilter = self.getWidgetData("search")
         self.factionFilter = ""
@@ -611,39 +747,32 @@ class CollectionManager(WidgetManagerBase):
             self.starredOnly = False
 
     def makeCreatureList(self):
-        self.creatureList = []
-        for name in self.creatureCollection.keys():
-            if self.textFilter not in name:
-                continue
-            creature = self.creatureCollection[name]
-            if self.factionFilter != "" and self.factionFilter != creature.faction:
-                continue
-            if self.starredOnly and (not creature.starred):
-                continue
-            self.creatureList.append(name)
-        self.creatureList.sort()
+        self.creatureList = self.model.view(self.textFilter, self.factionFilter, self.starredOnly)
     
     def shiftList(self, shift):
+        # coalesced scrolling can move several rows at once, so clamp rather than refuse
         canditate = self.creatureListShift + shift
         print(canditate)
-        if canditate < 0:
-            print("negative")
-            return
         if canditate + self.creatureLimit > len(self.creatureList):
             print("too much")
+            canditate = len(self.creatureList) - self.creatureLimit
+        if canditate < 0:
+            print("negative")
+            canditate = 0
+        if canditate == self.creatureListShift:
             return
         print(f"{canditate} - shift OK")
         self.creatureListShift = canditate
-        self.fullUpdate()
+        self.drawList()
     
     def drawList(self):
-        for idx in range(self.creatureListShift, min(self.creatureListShift + self.creatureLimit, len(self.creatureList))):
-            creatureName = self.creatureList[idx]
-            self.addCollectionItemWidgets(creatureName, self.creatureCollection[creatureName].starred)
+        window = self.creatureList[self.creatureListShift:self.creatureListShift + self.creatureLimit]
+        for slot in range(self.creatureLimit):
+            self.bindCollectionItemWidgets(slot, window[slot] if slot < len(window) else None)
     
+    @timed("collection.fullUpdate")
     def fullUpdate(self):
         self.updateFilters()
-        self.eraseList()
         self.makeCreatureList()
         if self.creatureListShift + self.creatureLimit > len(self.creatureList):
             self.creatureListShift = len(self.creatureList) - self.creatureLimit
@@ -652,111 +781,93 @@ class CollectionManager(WidgetManagerBase):
         self.drawList()
     
     def addCreature(self, creature : Creature, save=True):
-        self.creatureCollection[creature.name] = creature
-        if save:
-            self.saveCreature(creature)
+        self.addCreatures([creature], save)
+
+    def addCreatures(self, creatures, save=True):
+        self.model.add(creatures, save)
         self.fullUpdate()
     
     def deleteCreature(self, creatureName):
-        if self.creatureCollection.get(creatureName) is None:
-            return
-        del self.creatureCollection[creatureName]
-        remove(SAVEDIR + creatureName)
-        self.fullUpdate()
+        if self.model.delete(creatureName):
+            self.fullUpdate()
     
     def updateCreatureStar(self, creatureName):
-        creature = deepcopy(self.creatureCollection[creatureName])
-        creature.starred = creature.starred ^ 1
-        self.creatureCollection[creatureName] = creature
-        self.saveCreature(creature)
-    
-    def saveCreature(self, creature):
-        if not path.exists(SAVEDIR):
-            makedirs(SAVEDIR)
-        with open(SAVEDIR + creature.name, "w+") as file:
-            file.write(str(creature.HitPoints) + "\n")
-            file.write(str(creature.ArmorClass) + "\n")
-            file.write(str(creature.InititativeBonus) + "\n")
-            file.write(str(creature.faction) + "\n")
-            file.write(str(creature.starred) + "\n")
+        self.model.toggleStar(creatureName)
 
 class BattleManager(WidgetManagerBase):
     def __init__(self) -> None:
         super().__init__()
 
-        self.creatures = []
-        self.roundCounter = 0
-        self.turnCounter = 0
+        self.model = Battle()
+        self.model.listeners.append(self.modelChanged)
 
-        self.battleStringWidgets = []
+        self.battleStringWidgets = {}
+        self.battleRows = {}
+        self.shownRound = 0  # initiative values only move with the round, their labels are refreshed then
+        self.rowCount = 0  # numbers the canvas tag of each row
 
         battleHead = BorderedLabel( 6.0,  0.0,  8.0,  1.0, "Battlefield")
         self.addWidget(battleHead, "head")
 
-        nextTurn = Button( 6.0, 19.0,  4.0,  1.0, "> Next Turn >", lambda : self.newTurn())
+        nextTurn = Button( 6.0, 19.0,  4.0,  1.0, "> Next Turn >", lambda : self.model.newTurn())
         self.addWidget(nextTurn, "nextTurn")
-        nextRound = Button(10.0, 19.0,  4.0,  1.0, ">>> Next Round >>>", lambda : self.newRound())
+        nextRound = Button(10.0, 19.0,  4.0,  1.0, ">>> Next Round >>>", lambda : self.model.newRound())
         self.addWidget(nextRound, "nextRound")
 
-    def newRound(self):
-        if not len(self.creatures):
-            return
-        self.roundCounter += 1
-        self.creatures = sorted([creature.getAdvanced() for creature in self.creatures])
-        self.fullUpdate()
-    
-    def newTurn(self):
-        if not len(self.creatures):
-            return
-        if self.turnCounter >= len(self.creatures) - 1 or self.roundCounter == 0:
-            self.newRound()
-            self.turnCounter = 0
-        else:
-            self.turnCounter += 1
-        self.fullUpdate()
-
-    def addBattleItemWidgets(self, creature):
+    def addBattleItemWidgets(self, creature, row):
         hBase = 2
-        hShift = len(self.battleStringWidgets)
+        hShift = row
+
+        self.rowCount += 1
+        group = f"battle-row-{self.rowCount}"
+        tags = ("battle-rows", group)
 
         LocalEPS = 0.01
         background = BorderedLabel( 6.0 + LocalEPS,  hBase + hShift + 0.0,  8.0 - LocalEPS, 1.0, "", outlined=False)
-        if hShift == self.turnCounter and self.roundCounter:
-            background.defaultFill = FACTIONMAP[creature.faction]
+        background.tags = tags
         background.draw()
-        widgets.append(background)
-        ghosts.append(background)
+        background.ghost = True
+        registerWidget(background, group)
 
         initValue = BorderedLabel(  6.25,  hBase + hShift + 0.125,  0.75 * TRANSPOSE,  0.75, str(creature.InititativeValue))
+        initValue.tags = tags
         initValue.draw()
-        widgets.append(initValue)
+        registerWidget(initValue, group)
         initBonus = BorderedLabel(  6.35 + 0.75 * TRANSPOSE,  hBase + hShift + 0.125,  0.75 * TRANSPOSE,  0.75, str(creature.InititativeBonus))
+        initBonus.tags = tags
         initBonus.draw()
-        widgets.append(initBonus)
+        registerWidget(initBonus, group)
 
         name = BorderedLabel(  6.45 + 1.5 * TRANSPOSE,  hBase + hShift + 0.125,  4.55 - (0.45 + 1.5 * TRANSPOSE),  0.75, creature.name)
+        name.tags = tags
         name.draw()
-        widgets.append(name)
+        registerWidget(name, group)
         armorClass = BorderedLabel( 10.65,  hBase + hShift + 0.125,  0.5,  0.75, str(creature.ArmorClass))
+        armorClass.tags = tags
         armorClass.draw()
-        widgets.append(armorClass)
+        registerWidget(armorClass, group)
         hitPoints = BorderedLabel( 11.25,  hBase + hShift + 0.125,  0.5,  0.75, str(creature.HitPoints))
+        hitPoints.tags = tags
         hitPoints.draw()
-        widgets.append(hitPoints)
-        damageButton = Button( 11.85,  hBase + hShift + 0.125,  0.25,  0.75, "-", lambda : self.modifyHealth(hShift, -1))
+        registerWidget(hitPoints, group)
+        damageButton = Button( 11.85,  hBase + hShift + 0.125,  0.25,  0.75, "-", lambda : self.modifyHealth(self.battleRows[creature], -1))
+        damageButton.tags = tags
         damageButton.draw()
-        widgets.append(damageButton)
-        healButton = Button( 12.60,  hBase + hShift + 0.125,  0.25,  0.75, "+", lambda : self.modifyHealth(hShift, 1))
+        registerWidget(damageButton, group)
+        healButton = Button( 12.60,  hBase + hShift + 0.125,  0.25,  0.75, "+", lambda : self.modifyHealth(self.battleRows[creature], 1))
+        healButton.tags = tags
         healButton.draw()
-        widgets.append(healButton)
+        registerWidget(healButton, group)
         damageTextField = TextField( 12.10,  hBase + hShift + 0.125,  0.5,  0.75)
+        damageTextField.tags = tags
         damageTextField.draw()
-        widgets.append(damageTextField)
-        killButton = Button( 12.95,  hBase + hShift + 0.125,  0.8,  0.75, "kill", lambda : self.removeCreature(hShift))
+        registerWidget(damageTextField, group)
+        killButton = Button( 12.95,  hBase + hShift + 0.125,  0.8,  0.75, "kill", lambda : self.removeCreature(self.battleRows[creature]))
+        killButton.tags = tags
         killButton.draw()
-        widgets.append(killButton)
+        registerWidget(killButton, group)
 
-        self.battleStringWidgets.append({
+        self.battleStringWidgets[creature] = {
             "background": background,
             "initValue": initValue,
             "initBonus": initBonus,
@@ -767,29 +878,49 @@ class BattleManager(WidgetManagerBase):
             "healButton": healButton,
             "damageTextField": damageTextField,
             "killButton": killButton
-        })
+        }
+        self.battleRows[creature] = row
+
+    def modelChanged(self, command):
+        # a hit point change is one label, only order and turn changes need a pass over the rows
+        if command.reorders:
+            self.fullUpdate()
+        else:
+            self.battleStringWidgets[command.creature]["hitPoints"].set(command.creature.HitPoints)
+
+    def moveBattleItemWidgets(self, creature, row):
+        shift = row - self.battleRows[creature]
+        string = self.battleStringWidgets[creature]
+        canvas.move(string["background"].tags[1], 0, shift * HUNIT)
+        for widget in string.values():
+            widget.shiftEdges(0, shift)
+        self.battleRows[creature] = row
+
+    def refreshBattleItemWidgets(self, creature, row, advanced):
+        string = self.battleStringWidgets[creature]
+        if advanced:
+            string["initValue"].set(creature.InititativeValue)
+        fill = FACTIONMAP[creature.faction] if row == self.model.turnCounter and self.model.roundCounter else ""
+        if string["background"].defaultFill != fill:
+            string["background"].setFill(fill)
+
+    def eraseBattleItemWidgets(self, creature):
+        eraseGroup(self.battleStringWidgets.pop(creature)["background"].tags[1])
+        del self.battleRows[creature]
     
     def removeCreature(self, row):
-        self.creatures.pop(row)
-        if self.turnCounter > row:
-            self.turnCounter -= 1
-        if not len(self.creatures):
-            self.roundCounter = 0
-            self.turnCounter = 0
-        self.fullUpdate()
+        self.model.removeCreature(row)
     
     def modifyHealth(self, row, delta):
-        value = int(self.battleStringWidgets[row]["damageTextField"].text)
-        self.creatures[row].HitPoints += delta * value
-        self.fullUpdate()
+        text = self.battleStringWidgets[self.model.creatures[row]]["damageTextField"].text
+        if not isDice(text):
+            print("damage is nan")
+            return
+        try:
+            self.model.modifyHealth(row, delta * rollDice(text))
+        except ValueError as error:
+            print(f"hit points not changed, {error}")
 
-    def eraseList(self):
-        for string in self.battleStringWidgets:
-            for widget in string.values():
-                widget.erase()
-                widgets.pop(widgets.index(widget))
-        self.battleStringWidgets = []
-    
     '''
     def shiftList(self, shift):
         canditate = self.creatureListShift + shift
@@ -806,19 +937,30 @@ class BattleManager(WidgetManagerBase):
     '''
 
     def drawList(self):
-        for creature in self.creatures:
-            self.addBattleItemWidgets(creature)
+        advanced = self.shownRound != self.model.roundCounter
+        self.shownRound = self.model.roundCounter
+        for row, creature in enumerate(self.model.creatures):
+            if creature not in self.battleStringWidgets:
+                self.addBattleItemWidgets(creature, row)
+            elif self.battleRows[creature] != row:
+                self.moveBattleItemWidgets(creature, row)
+            self.refreshBattleItemWidgets(creature, row, advanced)
     
+    @timed("battle.fullUpdate")
     def fullUpdate(self):
-        self.eraseList()
+        # rows are keyed by creature, so only vanished creatures lose their widgets
+        present = set(self.model.creatures)
+        for creature in [creature for creature in self.battleStringWidgets.keys() if creature not in present]:
+            self.eraseBattleItemWidgets(creature)
         self.drawList()
     
     def addCreature(self, creature):
-        self.creatures.append(creature)
-        self.creatures[-1].prepare()
-        self.creatures.sort()
-        self.fullUpdate()
+        try:
+            self.model.addCreature(creature)
+        except ValueError as error:
+            print(f"{creature.name} not added, {error}")
 
+@timed("cursorMove")
 def cursorMove(event):
     global focusedWidget
     x, y = event.x, event.y
@@ -827,12 +969,11 @@ def cursorMove(event):
     elif focusedWidget is not None:
         focusedWidget.focusOut()
         focusedWidget = None
-    for widget in widgets:
-        if widget.cursorIn(x, y) and widget not in ghosts:
-            focusedWidget = widget
-            focusedWidget.focusIn()
-            break
+    focusedWidget = hitGrid.find(x, y)
+    if focusedWidget is not None:
+        focusedWidget.focusIn()
 
+@timed("LMBPress")
 def LMBPress(event):
     global selectedWidget
     if selectedWidget is not None and focusedWidget != selectedWidget:
@@ -841,9 +982,10 @@ def LMBPress(event):
     if selectedWidget is not None:
         selectedWidget.select()
 
-def keyPress(event):
+@timed("keyPress")
+def keyPress(keys):
     if selectedWidget is not None:
-        selectedWidget.input(event.keysym, event.char)
+        selectedWidget.inputMany(keys)
 
 def mouseWithin(x, y, units):
     x0, y0, x1, y1 = units
@@ -852,44 +994,240 @@ def mouseWithin(x, y, units):
         return False
     return True
 
-def mouseScroll(event):
-    x, y = event.x, event.y
-    shift = int(-1 * event.delta / abs(event.delta))
+@timed("mouseScroll")
+def mouseScroll(x, y, shift):
     if mouseWithin(x, y, appMaster.collection.scrollBounds):
         appMaster.collection.shiftList(shift)
 
+# raw events are queued and handled once per frame: the last motion wins,
+# wheel notches add up and typed keys go to the selected widget as one batch
+FRAMEDELAY = 16  # ms
+pendingMotion = None
+pendingScroll = None
+pendingKeys = []
+frameScheduled = False
+
+def scheduleFrame():
+    global frameScheduled
+    if not frameScheduled:
+        frameScheduled = True
+        root.after(FRAMEDELAY, processInput)
+
+def queueMotion(event):
+    global pendingMotion
+    pendingMotion = event
+    scheduleFrame()
+
+def queueScroll(event):
+    global pendingScroll
+    if event.delta == 0:
+        return
+    shift = -1 if event.delta > 0 else 1
+    notches = pendingScroll[2] if pendingScroll is not None else 0
+    pendingScroll = (event.x, event.y, notches + shift)
+    scheduleFrame()
+
+def queueKey(event):
+    pendingKeys.append((event.keysym, event.char))
+    scheduleFrame()
+
+@timed("processInput")
+def processInput():
+    global pendingMotion, pendingScroll, pendingKeys, frameScheduled
+    frameScheduled = False
+    motion, scroll, keys = pendingMotion, pendingScroll, pendingKeys
+    pendingMotion, pendingScroll, pendingKeys = None, None, []
+    if len(keys):
+        keyPress(keys)
+    if scroll is not None and scroll[2] != 0:
+        mouseScroll(*scroll)
+    if motion is not None:
+        cursorMove(motion)
+
+def flushed(handler):
+    # clicks and shortcuts act on what is under the cursor now, so queued input goes first
+    def wrapper(event):
+        if frameScheduled:
+            processInput()
+        return handler(event)
+    return wrapper
+
+RESIZEDELAY = 16  # ms, about one frame
+pendingSize = None
+
+@timed("configure")
 def configure(event):
-    global WUNIT, HUNIT, widgets
-    WUNIT, HUNIT = event.width / 20, event.height / 20
+    global pendingSize
+    if event.width < 2 or event.height < 2:  # minimized, nothing to lay out
+        return
+    if pendingSize is None:
+        root.after(RESIZEDELAY, applyResize)
+    pendingSize = (event.width, event.height)
+
+@timed("applyResize")
+def applyResize():
+    global WUNIT, HUNIT, pendingSize
+    width, height = pendingSize
+    pendingSize = None
+    wunit, hunit = width / 20, height / 20
+    if wunit == WUNIT and hunit == HUNIT:
+        return
+    # fonts are fixed, so stretching the existing items is the same as redrawing them
+    canvas.scale("all", 0, 0, wunit / WUNIT, hunit / HUNIT)
+    WUNIT, HUNIT = wunit, hunit
+    for widget in widgets:
+        widget.update()
+
+def relayout(event=None):
     for widget in widgets:
         widget.update()
         widget.draw()
-    root.update()
     
+hudText = None
+
+def toggleHud(event=None):
+    global hudText
+    if hudText is not None:
+        canvas.delete(hudText)
+        hudText = None
+        profiler.enabled = PROFILE
+        return
+    hudText = canvas.create_text(19.9 * WUNIT, 0.1 * HUNIT, text="", anchor="ne", justify="left", font=SUBFONT, fill="white")
+    profiler.enabled = True  # after the overlay's own item, which is not part of any frame
+    refreshHud()
+
+def refreshHud():
+    if hudText is None:
+        return
+    canvas.itemconfig(hudText, text=profiler.summary())
+    root.after(HUDINTERVAL, refreshHud)
+
+def exportTrace(event=None):
+    # kept out of SAVEDIR itself, where any stray file is taken for a legacy creature file
+    directory = path.join(SAVEDIR, TRACEDIR)
+    makedirs(directory, exist_ok=True)
+    filePath = path.join(directory, f"trace-{int(time())}.json")
+    count = profiler.exportTrace(filePath)
+    print(f"{count} trace events written to {filePath}")
+
+def askRestore(battle):
+    from tkinter import messagebox
+    return messagebox.askyesno("Restore battle", f"Resume the last battle? {len(battle.creatures)} creatures, round {battle.roundCounter}.")
+
+def openJournal():
+    # the previous session's journal is offered back, then replaced by this session's
+    directory = path.join(SAVEDIR, JOURNALDIR)
+    makedirs(directory, exist_ok=True)
+    filePath = path.join(directory, JOURNALNAME)
+    previous = loadJournal(filePath)
+    if previous is not None and len(previous.creatures) and askRestore(previous):
+        appMaster.battle.model.restore(previous)
+        appMaster.logs = appMaster.battle.model.log
+        appMaster.battle.fullUpdate()
+    journal = Journal(filePath)
+    journal.open(appMaster.battle.model)
+    return journal
+
+importing = None
+
+def importFile(event=None):
+    global importing
+    if importing is not None:
+        return
+    from tkinter import filedialog
+    filePath = filedialog.askopenfilename(title="Import compendium", filetypes=[("Compendium", "*.json *.jsonl *.csv"), ("All files", "*")])
+    if not filePath:
+        return
+    importing = importSteps(filePath, appMaster.collection.model)
+    root.after(0, importStep)
+
+def importStep():
+    # one batch per callback keeps the window responsive, the list is redrawn once when it is done
+    global importing
+    try:
+        report = next(importing)
+    except Exception as error:
+        # an unreadable file or a store error ends this import, not importing for the session
+        importing = None
+        appMaster.collection.fullUpdate()
+        print(f"import failed: {error!r}")
+        return
+    if not report.done:
+        root.after(0, importStep)
+        return
+    importing.close()
+    importing = None
+    appMaster.collection.fullUpdate()
+    print(report.summary())
+    for number, name, reason in report.rejects[:10]:
+        print(f"  entry {number} {name}: {reason}")
+
 def dud():
     print("Action Perofrmed")
 
 def makeLayout():
-    global widgets
-
     appMaster.editor = EditorManager()
     appMaster.collection = CollectionManager()
     appMaster.battle = BattleManager()
+    appMaster.logs = appMaster.battle.model.log
 
-    widgets.append(LineWidget( 6.0,  0.0,  6.0, 20.0))  # colletion | battle separator
-    widgets.append(LineWidget(14.0,  0.0, 14.0, 20.0))  # battle | settings separator
+    registerWidget(LineWidget( 6.0,  0.0,  6.0, 20.0))  # colletion | battle separator
+    registerWidget(LineWidget(14.0,  0.0, 14.0, 20.0))  # battle | settings separator
 
     for widget in widgets:
         widget.draw()
 
-makeLayout()
+def attach(window, surface, width, height):
+    # anything with after() and the Canvas item calls will do as window and surface
+    global root, canvas, WUNIT, HUNIT, TRANSPOSE
+    root, canvas = window, surface
+    WUNIT, HUNIT = width / 20, height / 20
+    TRANSPOSE = HUNIT / WUNIT
+
+def main():
+    from tkinter import Tk, Canvas  # only the windowed app pays for tkinter
+
+    window = Tk()
+    window.title("D'n'D Combat Assistant | Ver 0.1.0")
+    window.geometry(f"{WIDTH}x{HEIGHT}")
+    window.update()
+    surface = Canvas(width=window.winfo_width(), height=window.winfo_height(), bg="#1e1e1e")
+    surface.pack(fill="both", expand=True)
+    attach(window, CountingCanvas(surface), window.winfo_width(), window.winfo_height())
+    profiler.enabled = PROFILE
+
+    makeLayout()
+
+    canvas.bind("<Motion>", queueMotion)
+    canvas.bind("<Button-1>", flushed(LMBPress))
+    canvas.bind("<KeyPress>", queueKey)
+    canvas.bind("<MouseWheel>", queueScroll)
+    canvas.bind("<Configure>", configure)
+    canvas.bind("<F5>", flushed(relayout))
+    canvas.bind("<Control-z>", flushed(lambda event: appMaster.battle.model.undo()))
+    canvas.bind("<Control-y>", flushed(lambda event: appMaster.battle.model.redo()))
+    canvas.bind("<Control-Z>", flushed(lambda event: appMaster.battle.model.redo()))
+    canvas.bind("<F12>", toggleHud)
+    canvas.bind("<F11>", exportTrace)
+    canvas.bind("<Control-o>", flushed(importFile))
+    canvas.bind("<Escape>", lambda event: root.destroy())
+    canvas.focus_set()
+
+    journal = openJournal()
+    server = None
+    if SERVEPORT is not None:
+        from server import StateServer
+        try:
+            server = StateServer(SERVEHOST, SERVEPORT).start()
+        except OSError as error:
+            print(f"not serving the battle on port {SERVEPORT}: {error}")
+        else:
+            server.serveBattle(appMaster.battle.model)
 
-canvas.bind("<Motion>", cursorMove)
-canvas.bind("<Button-1>", LMBPress)
-canvas.bind("<KeyPress>", keyPress)
-canvas.bind("<MouseWheel>", mouseScroll)
-canvas.bind("<Configure>", configure)
-canvas.bind("<Escape>", lambda event: root.destroy())
-canvas.focus_set()
+    root.mainloop()
+    journal.close()
+    if server is not None:
+        server.stop()
 
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,230 @@
+import struct
+import threading
+import zlib
+from os import fsync, path, replace
+from queue import Queue, Empty
+
+from battle import Battle
+from combat import Creature, Combatant
+from commands import AddCreature, RemoveCreature, ModifyHealth, NewRound, NewTurn
+
+JOURNALNAME = "battle.journal"
+SNAPSHOTEVERY = 500  # records appended before the journal is compacted into a snapshot
+
+# every record is a header (kind, payload length, crc32 of the payload) and its payload;
+# a torn write at the end fails the length or crc check and replay stops there
+HEADER = struct.Struct("<BHI")
+STATE, CREATURE, ADD, REMOVE, HEALTH, ROUND, TURN, UNDO, REDO = range(9)
+COUNTERS = struct.Struct("<iiI")  # round, turn, creature count
+STATS = struct.Struct("<IiiiiiB")  # id, hp, initiative, max hp, ac, initiative bonus, starred
+ROW = struct.Struct("<I")
+AMOUNT = struct.Struct("<Ii")  # id, hit point change
+HITPOINTS = struct.Struct("<i")
+
+def frame(kind, payload=b""):
+    return HEADER.pack(kind, len(payload), zlib.crc32(payload)) + payload
+
+def packText(text):
+    data = text.encode()
+    return struct.pack("<H", len(data)) + data
+
+def unpackText(payload, offset):
+    size, = struct.unpack_from("<H", payload, offset)
+    offset += 2
+    return payload[offset:offset + size].decode(), offset + size
+
+def packCreature(key, creature):
+    template = getattr(creature, "template", creature)
+    stats = STATS.pack(key, creature.HitPoints, creature.InititativeValue, template.HitPoints, template.ArmorClass, template.InititativeBonus, int(template.starred))
+    return stats + packText(template.name) + packText(template.faction)
+
+def unpackCreature(payload):
+    key, hp, initiative, maxHp, ac, bonus, starred = STATS.unpack_from(payload)
+    name, offset = unpackText(payload, STATS.size)
+    faction, offset = unpackText(payload, offset)
+    combatant = Combatant(Creature(name, maxHp, ac, bonus, faction, starred), hp)
+    combatant.InititativeValue = initiative
+    combatant.updateSortKey()
+    return key, combatant
+
+def readRecords(filePath):
+    with open(filePath, "rb") as file:
+        data = file.read()
+    offset = 0
+    while offset + HEADER.size <= len(data):
+        kind, size, crc = HEADER.unpack_from(data, offset)
+        payload = data[offset + HEADER.size:offset + HEADER.size + size]
+        if len(payload) != size or zlib.crc32(payload) != crc:
+            return  # the tail of a write that never finished
+        yield kind, payload
+        offset += HEADER.size + size
+
+def readJournal(filePath):
+    # replays the last snapshot and everything after it into a fresh battle, undo history included
+    if not path.isfile(filePath):
+        return None
+    battle = Battle()
+    creatures = {}
+    for kind, payload in readRecords(filePath):
+        if kind == STATE:
+            battle = Battle()
+            creatures = {}
+            battle.roundCounter, battle.turnCounter, count = COUNTERS.unpack(payload)
+        elif kind == CREATURE:
+            key, creature = unpackCreature(payload)
+            creatures[key] = creature
+            battle.creatures.append(creature)
+        elif kind == ADD:
+            key, creature = unpackCreature(payload)
+            creatures[key] = creature
+            battle.execute(AddCreature(creature))
+        elif kind == REMOVE:
+            battle.execute(RemoveCreature(battle, ROW.unpack(payload)[0]))
+        elif kind == HEALTH:
+            key, amount = AMOUNT.unpack(payload)
+            battle.execute(ModifyHealth(creatures[key], amount))
+        elif kind == ROUND:
+            battle.execute(NewRound())
+        elif kind == TURN:
+            battle.execute(NewTurn(battle))
+        elif kind == UNDO:
+            battle.undo()
+        elif kind == REDO:
+            battle.redo()
+    return battle
+
+def loadJournal(filePath):
+    # a journal that no longer replays, say after a format change, is moved aside instead of failing every launch
+    try:
+        return readJournal(filePath)
+    except Exception as error:
+        brokenPath = filePath + ".broken"
+        replace(filePath, brokenPath)
+        print(f"could not replay {filePath} ({error!r}), moved it to {brokenPath}")
+        return None
+
+class Journal:
+    # the ui thread only encodes records; a writer thread appends them and fsyncs once per batch
+    def __init__(self, filePath, snapshotEvery=SNAPSHOTEVERY) -> None:
+        self.filePath = filePath
+        self.snapshotEvery = snapshotEvery
+        self.battle = None
+        self.ids = {}
+        self.nextId = 0
+        self.appended = 0
+        self.floor = 0  # log position at the last snapshot
+        self.mirrored = 0  # log entries past the floor that replay will rebuild
+        self.queue = Queue()
+        self.thread = None
+
+    def open(self, battle):
+        self.battle = battle
+        battle.journal = self
+        self.thread = threading.Thread(target=self.write, name="battle journal", daemon=True)
+        self.thread.start()
+        self.snapshot()
+
+    def close(self):
+        if self.thread is None:
+            return
+        self.battle.journal = None
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def idOf(self, creature):
+        key = self.ids.get(creature)
+        if key is None:
+            key = self.ids[creature] = self.nextId
+            self.nextId += 1
+        return key
+
+    def snapshot(self):
+        battle = self.battle
+        self.ids = {}
+        self.nextId = 0
+        records = [frame(STATE, COUNTERS.pack(battle.roundCounter, battle.turnCounter, len(battle.creatures)))]
+        for creature in battle.creatures:
+            records.append(frame(CREATURE, packCreature(self.idOf(creature), creature)))
+        self.appended = 0
+        self.floor = battle.log.position
+        self.mirrored = 0
+        self.queue.put((True, b"".join(records)))
+
+    def append(self, record):
+        self.appended += 1
+        if self.appended >= self.snapshotEvery:
+            self.snapshot()
+        else:
+            self.queue.put((False, record))
+
+    def encode(self, command):
+        # called before the command is applied, so a value the records cannot hold fails with nothing changed;
+        # None means the command has no record of its own and is covered by a snapshot
+        try:
+            if isinstance(command, AddCreature):
+                return frame(ADD, packCreature(self.idOf(command.creature), command.creature))
+            if isinstance(command, RemoveCreature):
+                return frame(REMOVE, ROW.pack(command.row))
+            if isinstance(command, ModifyHealth):
+                HITPOINTS.pack(command.creature.HitPoints + command.amount)  # the next snapshot has to hold the result
+                return frame(HEALTH, AMOUNT.pack(self.idOf(command.creature), command.amount))
+        except struct.error as error:
+            raise ValueError(f"out of range for the journal: {error}")
+        if isinstance(command, NewRound):
+            return frame(ROUND)
+        if isinstance(command, NewTurn):
+            return frame(TURN)
+        return None
+
+    def recordCommand(self, record):
+        # called after the command is applied and logged, with what encode() made of it
+        self.mirrored = self.battle.log.position - self.floor
+        if record is None:
+            self.snapshot()
+        else:
+            self.append(record)
+
+    def recordUndo(self):
+        # replay only knows the commands since the snapshot, anything older is covered by a new one
+        if self.battle.log.position < self.floor:
+            self.snapshot()
+        else:
+            self.append(frame(UNDO))
+
+    def recordRedo(self):
+        if not self.floor < self.battle.log.position <= self.floor + self.mirrored:
+            self.snapshot()
+        else:
+            self.append(frame(REDO))
+
+    def write(self):
+        file = open(self.filePath, "ab")
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            try:
+                while True:
+                    batch.append(self.queue.get_nowait())
+            except Empty:
+                pass
+            if batch[-1] is None:
+                running = False
+                batch.pop()
+            # records before the latest snapshot are already part of it
+            start = max([idx for idx, (isSnapshot, data) in enumerate(batch) if isSnapshot], default=-1)
+            if start >= 0:
+                file.close()
+                temporary = self.filePath + ".tmp"
+                with open(temporary, "wb") as snapshot:
+                    snapshot.write(batch[start][1])
+                    snapshot.flush()
+                    fsync(snapshot.fileno())
+                replace(temporary, self.filePath)
+                file = open(self.filePath, "ab")
+                batch = batch[start + 1:]
+            if len(batch):
+                file.write(b"".join(data for isSnapshot, data in batch))
+                file.flush()
+                fsync(file.fileno())
+        file.close()
@@ -0,0 +1,98 @@
+import numpy as np
+
+from combat import FACTIONRANK
+
+class ArrayCombat:
+    # drop-in for combat.Combat that keeps the numbers in arrays, for war-scale battles
+    def __init__(self, capacity=64) -> None:
+        self.roster = []
+        self.rosterIndex = {}
+        self.roundCounter = 0
+        self.turnCounter = 0
+        self.count = 0
+
+        self.hp = np.zeros(capacity, dtype=np.int64)
+        self.ac = np.zeros(capacity, dtype=np.int64)
+        self.bonus = np.zeros(capacity, dtype=np.int64)
+        self.value = np.zeros(capacity, dtype=np.int64)
+        self.rank = np.zeros(capacity, dtype=np.int64)
+        self.nameRank = np.zeros(0, dtype=np.int64)
+        self.order = np.zeros(0, dtype=np.int64)
+
+    def grow(self, needed):
+        if needed <= len(self.hp):
+            return
+        capacity = max(len(self.hp), 1)
+        while capacity < needed:
+            capacity *= 2
+        for field in ("hp", "ac", "bonus", "value", "rank"):
+            array = np.zeros(capacity, dtype=np.int64)
+            array[:self.count] = getattr(self, field)[:self.count]
+            setattr(self, field, array)
+
+    def addCreature(self, creature):
+        self.addCreatures([creature])
+
+    def addCreatures(self, creatures):
+        self.grow(self.count + len(creatures))
+        for creature in creatures:
+            creature.prepare()
+            idx = self.count
+            self.roster.append(creature)
+            self.rosterIndex[creature] = idx
+            self.hp[idx] = creature.HitPoints
+            self.ac[idx] = creature.ArmorClass
+            self.bonus[idx] = creature.InititativeBonus
+            self.value[idx] = creature.InititativeValue
+            self.rank[idx] = FACTIONRANK.get(creature.faction, len(FACTIONRANK))
+            self.count += 1
+        # name ranks and the order are rebuilt once, the next time the order is read
+        self.nameRank = None
+        self.order = None
+
+    def reorder(self):
+        n = self.count
+        if self.nameRank is None:
+            # names never change, so their tie-break ranks only move when someone joins
+            self.nameRank = np.argsort(np.argsort(np.array([creature.name for creature in self.roster]), kind="stable"), kind="stable")
+        # lexsort sorts by the last key first: value desc, faction rank, bonus desc, name
+        self.order = np.lexsort((self.nameRank, -self.bonus[:n], self.rank[:n], -self.value[:n]))
+
+    def ordering(self):
+        if self.order is None:
+            self.reorder()
+        return self.order
+
+    def newRound(self):
+        self.roundCounter += 1
+        self.value[:self.count] += self.bonus[:self.count]
+        self.reorder()
+
+    def newTurn(self):
+        if self.turnCounter == 0:
+            self.newRound()
+        snapshot = (self.roundCounter, self.turnCounter + 1, self.sync(self.ordering()[self.turnCounter]))
+        self.turnCounter = (self.turnCounter + 1) % self.count
+        return snapshot
+
+    def sync(self, idx):
+        creature = self.roster[idx]
+        creature.HitPoints = int(self.hp[idx])
+        creature.InititativeValue = int(self.value[idx])
+        creature.updateSortKey()
+        return creature
+
+    @property
+    def creatures(self):
+        return [self.sync(idx) for idx in self.ordering()]
+
+    def damage(self, creature, damage):
+        self.hp[self.rosterIndex[creature]] -= damage
+
+    def damageMany(self, creatures, damages):
+        # repeated targets accumulate, like calling damage once per hit
+        indices = np.fromiter((self.rosterIndex[creature] for creature in creatures), dtype=np.int64, count=len(creatures))
+        np.subtract.at(self.hp, indices, np.asarray(damages, dtype=np.int64))
+
+    def alive(self):
+        return self.hp[:self.count] > 0
@@ -0,0 +1,115 @@
+import json
+from collections import deque
+from functools import wraps
+from time import perf_counter_ns
+
+SAMPLES = 1000  # latencies kept per span name for the percentiles
+MAXTRACEEVENTS = 200000
+
+class Profiler:
+    # off unless enabled: a disabled span costs one attribute check
+    def __init__(self) -> None:
+        self.enabled = False
+        self.start = perf_counter_ns()
+        self.samples = {}
+        self.events = []
+        self.depth = 0
+        self.created = 0
+        self.deleted = 0
+        self.frames = deque(maxlen=SAMPLES)  # (created, deleted) per outermost span
+
+    def reset(self):
+        self.samples = {}
+        self.events = []
+        self.frames.clear()
+        self.created = 0
+        self.deleted = 0
+
+    def record(self, name, begin, end):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=SAMPLES)
+        samples.append(end - begin)
+        if len(self.events) < MAXTRACEEVENTS:
+            self.events.append({"name": name, "ph": "X", "pid": 1, "tid": 1, "ts": (begin - self.start) / 1000, "dur": (end - begin) / 1000})
+
+    def endFrame(self, end):
+        # the outermost span is one event from tk, which is as close to a frame as we get
+        self.frames.append((self.created, self.deleted))
+        if len(self.events) < MAXTRACEEVENTS:
+            self.events.append({"name": "canvas items", "ph": "C", "pid": 1, "tid": 1, "ts": (end - self.start) / 1000, "args": {"created": self.created, "deleted": self.deleted}})
+        self.created = 0
+        self.deleted = 0
+
+    def percentiles(self, name):
+        samples = sorted(self.samples.get(name, ()))
+        if not len(samples):
+            return None
+        return samples[len(samples) // 2] / 1e6, samples[min(len(samples) - 1, len(samples) * 99 // 100)] / 1e6
+
+    def summary(self):
+        lines = [f"{'span':<24}{'n':>6}{'p50 ms':>9}{'p99 ms':>9}"]
+        for name in sorted(self.samples):
+            p50, p99 = self.percentiles(name)
+            lines.append(f"{name:<24}{len(self.samples[name]):>6}{p50:>9.2f}{p99:>9.2f}")
+        if len(self.frames):
+            created = max(frame[0] for frame in self.frames)
+            deleted = max(frame[1] for frame in self.frames)
+            lines.append(f"items per frame  last +{self.frames[-1][0]} -{self.frames[-1][1]}  max +{created} -{deleted}")
+        return "\n".join(lines)
+
+    def exportTrace(self, filePath):
+        # loads in chrome://tracing and Perfetto
+        with open(filePath, "w") as file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, file)
+        return len(self.events)
+
+profiler = Profiler()
+
+def timed(name):
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            profiler.depth += 1
+            begin = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                end = perf_counter_ns()
+                profiler.depth -= 1
+                profiler.record(name, begin, end)
+                if not profiler.depth:
+                    profiler.endFrame(end)
+        return wrapper
+    return decorate
+
+class CountingCanvas:
+    # passes everything through to the real canvas, counting items as they come and go while recording
+    def __init__(self, canvas) -> None:
+        self.canvas = canvas
+
+    def __getattr__(self, name):
+        return getattr(self.canvas, name)
+
+    def create_rectangle(self, *args, **kwargs):
+        if profiler.enabled:
+            profiler.created += 1
+        return self.canvas.create_rectangle(*args, **kwargs)
+
+    def create_text(self, *args, **kwargs):
+        if profiler.enabled:
+            profiler.created += 1
+        return self.canvas.create_text(*args, **kwargs)
+
+    def create_line(self, *args, **kwargs):
+        if profiler.enabled:
+            profiler.created += 1
+        return self.canvas.create_line(*args, **kwargs)
+
+    def delete(self, *args):
+        # a tag can stand for a whole row of items, so they are counted before they go
+        if profiler.enabled:
+            profiler.deleted += sum(len(self.canvas.find_withtag(tag)) for tag in args)
+        return self.canvas.delete(*args)
@@ -0,0 +1,152 @@
+from bisect import bisect_left
+from heapq import merge
+
+def trigrams(text):
+    return {text[idx:idx + 3] for idx in range(len(text) - 2)}
+
+class NameIndex:
+    def __init__(self, caseSensitive=True) -> None:
+        self.caseSensitive = caseSensitive
+        self.keys = {}  # name -> normalized name
+        self.grams = {}  # trigram -> names containing it
+        self.lastQuery = None
+        self.lastResult = None
+
+    def normalize(self, text):
+        return text if self.caseSensitive else text.lower()
+
+    def add(self, name):
+        if name in self.keys:
+            return
+        key = self.normalize(name)
+        self.keys[name] = key
+        for gram in trigrams(key):
+            self.grams.setdefault(gram, set()).add(name)
+        if self.lastQuery is not None and self.lastQuery in key:
+            self.lastResult.add(name)
+
+    def remove(self, name):
+        key = self.keys.pop(name, None)
+        if key is None:
+            return
+        for gram in trigrams(key):
+            names = self.grams[gram]
+            names.discard(name)
+            if not len(names):
+                del self.grams[gram]
+        if self.lastResult is not None:
+            self.lastResult.discard(name)
+
+    def candidates(self, query):
+        if self.lastQuery is not None and self.lastQuery in query:  # typing on narrows the last result
+            return self.lastResult
+        if len(query) < 3:
+            return self.keys.keys()
+        postings = sorted((self.grams.get(gram, set()) for gram in trigrams(query)), key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def search(self, query):
+        query = self.normalize(query)
+        if query == "":
+            return self.keys.keys()
+        result = {name for name in self.candidates(query) if query in self.keys[name]}
+        self.lastQuery, self.lastResult = query, result
+        return result
+
+    def prefixFirst(self, names, query):
+        # stable partition, so both groups keep the order they came in
+        query = self.normalize(query)
+        prefixed, rest = [], []
+        for name in names:
+            (prefixed if self.keys[name].startswith(query) else rest).append(name)
+        return prefixed + rest
+
+class SortedNames:
+    def __init__(self) -> None:
+        self.names = []
+        self.members = set()
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def add(self, name):
+        if name in self.members:
+            return
+        self.members.add(name)
+        self.names.insert(bisect_left(self.names, name), name)
+
+    def addMany(self, names):
+        fresh = sorted({name for name in names if name not in self.members})
+        if len(fresh) < 2:
+            for name in fresh:
+                self.add(name)
+            return
+        self.members.update(fresh)
+        self.names[:] = merge(self.names, fresh)
+
+    def remove(self, name):
+        if name not in self.members:
+            return
+        self.members.discard(name)
+        del self.names[bisect_left(self.names, name)]
+
+    def select(self, members):
+        # a small match set is sorted on its own, a walk over every name only pays off for a large one
+        if len(members) * 8 < len(self.names):
+            return sorted(name for name in members if name in self.members)
+        return [name for name in self.names if name in members]
+
+class FacetIndex:
+    def __init__(self) -> None:
+        self.factionOf = {}
+        self.factions = {}  # faction -> names
+        self.starred = set()
+
+    def add(self, name, faction, starred):
+        self.remove(name)
+        self.factionOf[name] = faction
+        self.factions.setdefault(faction, set()).add(name)
+        self.setStarred(name, starred)
+
+    def remove(self, name):
+        faction = self.factionOf.pop(name, None)
+        if faction is None:
+            return
+        self.factions[faction].discard(name)
+        self.starred.discard(name)
+
+    def setStarred(self, name, starred):
+        if starred:
+            self.starred.add(name)
+        else:
+            self.starred.discard(name)
+
+    def select(self, faction, starredOnly):
+        # None means the facets do not restrict the result
+        if faction == "":
+            return self.starred if starredOnly else None
+        names = self.factions.get(faction, set())
+        return names & self.starred if starredOnly else names
+
+class ResultCache:
+    def __init__(self, size=32) -> None:
+        self.size = size
+        self.results = {}
+
+    def get(self, key):
+        result = self.results.pop(key, None)
+        if result is not None:
+            self.results[key] = result  # most recent goes last
+        return result
+
+    def put(self, key, result):
+        self.results.pop(key, None)
+        self.results[key] = result
+        if len(self.results) > self.size:
+            del self.results[next(iter(self.results))]
+
+    def clear(self):
+        self.results = {}
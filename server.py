@@ -0,0 +1,266 @@
+import asyncio
+import json
+import threading
+from argparse import ArgumentParser
+
+HOST = "127.0.0.1"
+PORT = 8765
+TICK = 0.1  # seconds, changes inside one tick go out as a single delta
+MAXBUFFER = 1 << 20  # clients that fall this far behind are dropped
+
+# how much of a creature's hit points players get to see, per faction
+VISIBILITY = {
+    "player": "exact",
+    "NPC": "status",
+    "enemy": "status",
+    "undef": "hidden"
+}
+
+def healthStatus(hp, maxHp):
+    if hp <= 0:
+        return "down"
+    if hp * 2 <= maxHp:
+        return "bloodied"
+    return "healthy"
+
+def describe(creature, visibility):
+    entry = {"name": creature.name, "faction": creature.faction}
+    rule = visibility.get(creature.faction, "hidden")
+    if rule == "exact":
+        entry["hp"] = creature.HitPoints
+    elif rule == "status":
+        template = getattr(creature, "template", creature)
+        entry["status"] = healthStatus(creature.HitPoints, template.HitPoints)
+    return entry
+
+def diff(old, new):
+    # the fields of new that differ from old; removed creatures are listed by id
+    delta = {}
+    if new["round"] != old["round"]:
+        delta["round"] = new["round"]
+    if new["turn"] != old["turn"]:
+        delta["turn"] = new["turn"]
+    if new["order"] != old["order"]:
+        delta["order"] = new["order"]
+    changed = {}
+    for key, entry in new["creatures"].items():
+        previous = old["creatures"].get(key)
+        if previous is None:
+            changed[key] = entry
+        elif previous != entry:
+            changed[key] = {field: value for field, value in entry.items() if previous.get(field) != value}
+            for field in previous.keys() - entry.keys():
+                changed[key][field] = None
+    if len(changed):
+        delta["creatures"] = changed
+    removed = [key for key in old["creatures"] if key not in new["creatures"]]
+    if len(removed):
+        delta["removed"] = removed
+    return delta
+
+def applyDelta(state, message):
+    # what a client does with each line it receives
+    if message["type"] == "snapshot":
+        return {field: message[field] for field in ("round", "turn", "order", "creatures")}
+    for field in ("round", "turn", "order"):
+        if field in message:
+            state[field] = message[field]
+    for key, fields in message.get("creatures", {}).items():
+        entry = state["creatures"].setdefault(key, {})
+        for field, value in fields.items():
+            if value is None:
+                entry.pop(field, None)
+            else:
+                entry[field] = value
+    for key in message.get("removed", ()):
+        state["creatures"].pop(key, None)
+    return state
+
+def emptyState():
+    return {"round": 0, "turn": None, "order": [], "creatures": {}}
+
+class StateServer:
+    # serves the battle as newline delimited json over tcp from its own thread,
+    # so the tk mainloop only pays for taking a snapshot when the battle changes
+    def __init__(self, host=HOST, port=PORT, tick=TICK, visibility=VISIBILITY) -> None:
+        self.host = host
+        self.port = port
+        self.tick = tick
+        self.visibility = visibility
+        self.ids = {}
+        self.nextId = 0
+        self.loop = None
+        self.thread = None
+        self.server = None
+        self.ready = threading.Event()
+        self.error = None  # why the server thread stopped, if it did on its own
+        self.clients = set()
+        self.pending = None
+        self.state = emptyState()
+        self.sequence = 0
+
+    def idOf(self, creature):
+        key = self.ids.get(creature)
+        if key is None:
+            self.nextId += 1
+            key = self.ids[creature] = str(self.nextId)
+        return key
+
+    def snapshot(self, battle):
+        order = [self.idOf(creature) for creature in battle.creatures]
+        present = set(battle.creatures)
+        for creature in [creature for creature in self.ids if creature not in present]:
+            del self.ids[creature]
+        turn = order[battle.turnCounter] if battle.roundCounter and 0 <= battle.turnCounter < len(order) else None
+        creatures = {key: describe(creature, self.visibility) for key, creature in zip(order, battle.creatures)}
+        return {"round": battle.roundCounter, "turn": turn, "order": order, "creatures": creatures}
+
+    def serveBattle(self, battle):
+        battle.listeners.append(lambda command: self.publish(battle))
+        self.publish(battle)
+
+    def publish(self, battle):
+        # called on the ui thread after every battle change
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        state = self.snapshot(battle)
+        try:
+            loop.call_soon_threadsafe(self.setPending, state)
+        except RuntimeError:  # the loop closed after the check
+            pass
+
+    def setPending(self, state):
+        self.pending = state
+
+    def encode(self, message):
+        return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+    def send(self, writer, data):
+        if writer.transport.get_write_buffer_size() > MAXBUFFER:
+            writer.close()
+            self.clients.discard(writer)
+            return
+        writer.write(data)
+
+    async def broadcast(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            if self.pending is None:
+                continue
+            state, self.pending = self.pending, None
+            delta = diff(self.state, state)
+            self.state = state
+            if not len(delta):
+                continue
+            self.sequence += 1
+            delta["type"] = "delta"
+            delta["seq"] = self.sequence
+            data = self.encode(delta)  # encoded once, whatever the number of clients
+            for writer in list(self.clients):
+                self.send(writer, data)
+
+    async def handle(self, reader, writer):
+        self.send(writer, self.encode(dict(self.state, type="snapshot", seq=self.sequence)))
+        self.clients.add(writer)
+        try:
+            while await reader.read(1024):  # clients have nothing to say, this just waits for them to leave
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    async def serve(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]  # port 0 picks a free one
+        self.ready.set()
+        ticker = asyncio.ensure_future(self.broadcast())
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            ticker.cancel()
+
+    def run(self, loop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self.serve())
+        except asyncio.CancelledError:
+            pass
+        except Exception as error:  # a port already in use, most likely
+            self.error = error
+        finally:
+            self.ready.set()
+            loop.close()
+
+    def start(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run, args=(self.loop,), name="state server", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            self.loop = None
+            self.thread.join()
+            raise self.error
+        return self
+
+    def stop(self):
+        if self.loop is None:
+            return
+        loop, self.loop = self.loop, None
+        if not loop.is_closed():
+            try:
+                for writer in list(self.clients):
+                    loop.call_soon_threadsafe(writer.close)
+                if self.server is not None:
+                    loop.call_soon_threadsafe(self.server.close)
+            except RuntimeError:  # the thread finished in the meantime
+                pass
+        self.thread.join()
+
+class StateClient:
+    # a player display without the display: keeps the latest state up to date from the stream
+    def __init__(self) -> None:
+        self.state = emptyState()
+        self.sequence = None
+
+    def receive(self, line):
+        message = json.loads(line)
+        self.state = applyDelta(self.state, message)
+        self.sequence = message["seq"]
+        return self.state
+
+    async def follow(self, host=HOST, port=PORT, onState=None):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return self.state
+                self.receive(line)
+                if onState is not None:
+                    onState(self.state)
+        finally:
+            writer.close()
+
+def printState(state):
+    print(f"round {state['round']}")
+    for key in state["order"]:
+        entry = state["creatures"][key]
+        health = entry.get("hp", entry.get("status", ""))
+        print(f"{'>' if key == state['turn'] else ' '} {entry['name']:<24} {health}")
+
+def main():
+    parser = ArgumentParser(description="Follow the initiative order served by the tracker")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(StateClient().follow(args.host, args.port, printState))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
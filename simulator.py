@@ -0,0 +1,142 @@
+import random
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os import cpu_count
+
+from combat import Combat, Combatant, Creature, roll
+
+ATTACKBONUS = 4
+DAMAGEDIE = 8
+MAXROUNDS = 100
+CHUNKRUNS = 250  # runs per task; fixed so a seed gives the same result on any number of workers
+
+def playEncounter(party, enemies, attackBonus=ATTACKBONUS, damageDie=DAMAGEDIE, maxRounds=MAXROUNDS):
+    # every creature swings at a random standing opponent on its turn
+    roster = [Combatant(creature) for creature in party + enemies]
+    side = {creature: (0 if idx < len(party) else 1) for idx, creature in enumerate(roster)}
+    standing = [[creature for creature in roster if side[creature] == team and creature.HitPoints > 0] for team in (0, 1)]
+    fight = Combat()
+    for creature in roster:
+        fight.addCreature(creature)
+    rounds = 0
+    while len(standing[0]) and len(standing[1]):
+        rounds, turn, creature = fight.newTurn()
+        if rounds > maxRounds:
+            rounds = maxRounds
+            break
+        if creature.HitPoints <= 0:
+            continue
+        targets = standing[1 - side[creature]]
+        target = targets[roll(len(targets)) - 1]
+        if roll(20) + attackBonus >= target.ArmorClass:
+            target.damage(roll(damageDie))
+            if target.HitPoints <= 0:
+                targets.remove(target)
+    winner = 0 if not len(standing[1]) and len(standing[0]) else (1 if not len(standing[0]) else None)
+    return rounds, winner, [creature.HitPoints for creature in roster]
+
+class EncounterReport:
+    def __init__(self, labels) -> None:
+        self.labels = labels
+        self.runs = 0
+        self.rounds = {}
+        self.wins = [0, 0]
+        self.survivals = [0] * len(labels)
+        self.hpTotals = [0] * len(labels)
+
+    def record(self, rounds, winner, hitPoints):
+        self.runs += 1
+        self.rounds[rounds] = self.rounds.get(rounds, 0) + 1
+        if winner is not None:
+            self.wins[winner] += 1
+        for idx, hp in enumerate(hitPoints):
+            if hp > 0:
+                self.survivals[idx] += 1
+                self.hpTotals[idx] += hp
+
+    def merge(self, other):
+        self.runs += other.runs
+        for rounds, count in other.rounds.items():
+            self.rounds[rounds] = self.rounds.get(rounds, 0) + count
+        self.wins = [mine + theirs for mine, theirs in zip(self.wins, other.wins)]
+        self.survivals = [mine + theirs for mine, theirs in zip(self.survivals, other.survivals)]
+        self.hpTotals = [mine + theirs for mine, theirs in zip(self.hpTotals, other.hpTotals)]
+
+    def partyWinRate(self):
+        return self.wins[0] / self.runs if self.runs else 0.0
+
+    def roundsDistribution(self):
+        return {rounds: count / self.runs for rounds, count in sorted(self.rounds.items())}
+
+    def expectedRounds(self):
+        return sum(rounds * count for rounds, count in self.rounds.items()) / self.runs if self.runs else 0.0
+
+    def survivalProbability(self):
+        return {label: survived / self.runs for label, survived in zip(self.labels, self.survivals)} if self.runs else {}
+
+    def expectedHitPoints(self):
+        # dead creatures count as 0 hp remaining
+        return {label: total / self.runs for label, total in zip(self.labels, self.hpTotals)} if self.runs else {}
+
+def makeLabels(creatures):
+    seen = {}
+    labels = []
+    for creature in creatures:
+        seen[creature.name] = seen.get(creature.name, 0) + 1
+        labels.append(creature.name if seen[creature.name] == 1 else f"{creature.name} #{seen[creature.name]}")
+    return labels
+
+def runChunk(party, enemies, runs, seed, attackBonus, damageDie, maxRounds):
+    # roll() draws from the module-level generator, which is private to each worker process
+    random.seed(seed)
+    report = EncounterReport(makeLabels(party + enemies))
+    for _ in range(runs):
+        report.record(*playEncounter(party, enemies, attackBonus, damageDie, maxRounds))
+    return report
+
+def simulate(party, enemies, runs=10000, seed=None, workers=None, attackBonus=ATTACKBONUS, damageDie=DAMAGEDIE, maxRounds=MAXROUNDS, onProgress=None):
+    workers = workers or cpu_count() or 1
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    sizes = [min(CHUNKRUNS, runs - start) for start in range(0, runs, CHUNKRUNS)]
+    report = EncounterReport(makeLabels(party + enemies))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(runChunk, party, enemies, size, f"{seed}:{idx}", attackBonus, damageDie, maxRounds) for idx, size in enumerate(sizes)]
+        for future in as_completed(futures):
+            report.merge(future.result())
+            if onProgress is not None:
+                onProgress(report)
+    return report
+
+def main():
+    from storage import SAVEDIR, openStore
+
+    parser = ArgumentParser(description="Play an encounter out many times using creatures from the collection")
+    parser.add_argument("--party", nargs="+", required=True)
+    parser.add_argument("--enemies", nargs="+", required=True)
+    parser.add_argument("--runs", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--attack-bonus", type=int, default=ATTACKBONUS)
+    parser.add_argument("--damage-die", type=int, default=DAMAGEDIE)
+    args = parser.parse_args()
+
+    store = openStore(SAVEDIR, Creature)
+    lineups = []
+    for names in (args.party, args.enemies):
+        lineup = []
+        for name in names:
+            creature = store.findByName(name)
+            if creature is None:
+                parser.error(f"no creature named {name} in the collection")
+            lineup.append(creature)
+        lineups.append(lineup)
+    store.close()
+
+    report = simulate(lineups[0], lineups[1], args.runs, args.seed, args.workers, args.attack_bonus, args.damage_die)
+    print(f"{report.runs} runs, party wins {report.partyWinRate():.1%}, {report.expectedRounds():.2f} rounds on average")
+    survival = report.survivalProbability()
+    for label, hp in report.expectedHitPoints().items():
+        print(f"  {label:<24} survives {survival[label]:6.1%}   expected hp {hp:6.2f}")
+
+if __name__ == "__main__":
+    main()
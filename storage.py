@@ -0,0 +1,214 @@
+import sqlite3
+from contextlib import contextmanager
+from os import path, makedirs, listdir, remove, rename
+
+from perf import timed
+
+SAVEDIR = "./DnD-Init-Tracker-Resources/"
+DBNAME = "collection.db"
+LEGACYDIR = "legacy"
+
+def readCreatureFile(filePath, name, creatureType):
+    with open(filePath, "r") as file:
+        hp = int(file.readline().strip())
+        ac = int(file.readline().strip())
+        init = int(file.readline().strip())
+        faction = file.readline().strip()
+        starred = int(file.readline().strip())
+    return creatureType(name, hp, ac, init, faction, starred)
+
+def writeCreatureFile(filePath, creature):
+    with open(filePath, "w+") as file:
+        file.write(str(creature.HitPoints) + "\n")
+        file.write(str(creature.ArmorClass) + "\n")
+        file.write(str(creature.InititativeBonus) + "\n")
+        file.write(str(creature.faction) + "\n")
+        file.write(str(creature.starred) + "\n")
+
+def listCreatureFiles(directory):
+    for name in listdir(directory):
+        if name.startswith(DBNAME) or not path.isfile(path.join(directory, name)):
+            continue
+        yield name
+
+class FileStore:
+    # the original layout: one text file per creature, named after it
+    def __init__(self, directory, creatureType) -> None:
+        self.directory = directory
+        self.creatureType = creatureType
+        if not path.exists(self.directory):
+            makedirs(self.directory)
+
+    @timed("store.loadAll")
+    def loadAll(self):
+        creatures = []
+        for name in listCreatureFiles(self.directory):
+            try:
+                creatures.append(readCreatureFile(path.join(self.directory, name), name, self.creatureType))
+            except Exception:
+                continue
+        return creatures
+
+    def loadBatches(self, size):
+        # the directory is read lazily, size creatures at a time
+        batch = []
+        for name in listCreatureFiles(self.directory):
+            try:
+                batch.append(readCreatureFile(path.join(self.directory, name), name, self.creatureType))
+            except Exception:
+                continue
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if len(batch):
+            yield batch
+
+    def findByName(self, name):
+        filePath = path.join(self.directory, name)
+        if not path.isfile(filePath):
+            return None
+        return readCreatureFile(filePath, name, self.creatureType)
+
+    def findByFaction(self, faction):
+        return [creature for creature in self.loadAll() if creature.faction == faction]
+
+    def findStarred(self):
+        return [creature for creature in self.loadAll() if creature.starred]
+
+    def save(self, creature):
+        writeCreatureFile(path.join(self.directory, creature.name), creature)
+
+    @timed("store.saveMany")
+    def saveMany(self, creatures):
+        for creature in creatures:
+            self.save(creature)
+
+    def delete(self, name):
+        filePath = path.join(self.directory, name)
+        if path.isfile(filePath):
+            remove(filePath)
+
+    @contextmanager
+    def batch(self):
+        yield self
+
+    def close(self):
+        pass
+
+class SQLiteStore:
+    def __init__(self, directory, creatureType) -> None:
+        self.directory = directory
+        self.creatureType = creatureType
+        if not path.exists(self.directory):
+            makedirs(self.directory)
+        self.connection = sqlite3.connect(path.join(self.directory, DBNAME))
+        self.batchDepth = 0
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS creatures (
+                name TEXT PRIMARY KEY,
+                hp INTEGER NOT NULL,
+                ac INTEGER NOT NULL,
+                initiative INTEGER NOT NULL,
+                faction TEXT NOT NULL,
+                starred INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS creaturesByFaction ON creatures (faction);
+            CREATE INDEX IF NOT EXISTS creaturesByStarred ON creatures (starred);
+        """)
+
+    def makeCreature(self, row):
+        return self.creatureType(*row)
+
+    def query(self, where="", parameters=()):
+        cursor = self.connection.execute("SELECT name, hp, ac, initiative, faction, starred FROM creatures " + where, parameters)
+        return [self.makeCreature(row) for row in cursor]
+
+    @timed("store.loadAll")
+    def loadAll(self):
+        return self.query()
+
+    def loadBatches(self, size):
+        # one open cursor, size rows fetched per step; writes in between do not invalidate it
+        cursor = self.connection.execute("SELECT name, hp, ac, initiative, faction, starred FROM creatures")
+        while True:
+            rows = cursor.fetchmany(size)
+            if not len(rows):
+                return
+            yield [self.makeCreature(row) for row in rows]
+
+    def findByName(self, name):
+        creatures = self.query("WHERE name = ?", (name,))
+        return creatures[0] if len(creatures) else None
+
+    def findByFaction(self, faction):
+        return self.query("WHERE faction = ?", (faction,))
+
+    def findStarred(self):
+        return self.query("WHERE starred != 0")
+
+    def commit(self):
+        if not self.batchDepth:
+            self.connection.commit()
+
+    def save(self, creature):
+        self.saveMany([creature])
+
+    @timed("store.saveMany")
+    def saveMany(self, creatures):
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO creatures (name, hp, ac, initiative, faction, starred) VALUES (?, ?, ?, ?, ?, ?)",
+            ((creature.name, creature.HitPoints, creature.ArmorClass, creature.InititativeBonus, creature.faction, int(creature.starred)) for creature in creatures)
+        )
+        self.commit()
+
+    def delete(self, name):
+        self.connection.execute("DELETE FROM creatures WHERE name = ?", (name,))
+        self.commit()
+
+    @contextmanager
+    def batch(self):
+        # everything written inside the block lands in a single transaction
+        self.batchDepth += 1
+        try:
+            yield self
+        except Exception:
+            self.batchDepth -= 1
+            if not self.batchDepth:
+                self.connection.rollback()
+            raise
+        self.batchDepth -= 1
+        self.commit()
+
+    def close(self):
+        self.connection.close()
+
+STORES = {
+    "sqlite": SQLiteStore,
+    "files": FileStore
+}
+
+def migrateFiles(directory, store):
+    # one-time move of per-creature files into the store, originals are kept under LEGACYDIR
+    names = list(listCreatureFiles(directory))
+    if not len(names):
+        return 0
+    creatures = []
+    for name in names:
+        try:
+            creatures.append(readCreatureFile(path.join(directory, name), name, store.creatureType))
+        except Exception:
+            continue
+    with store.batch():
+        store.saveMany(creatures)
+    legacyDir = path.join(directory, LEGACYDIR)
+    if not path.exists(legacyDir):
+        makedirs(legacyDir)
+    for name in names:
+        rename(path.join(directory, name), path.join(legacyDir, name))
+    return len(creatures)
+
+def openStore(directory, creatureType, backend="sqlite"):
+    store = STORES[backend](directory, creatureType)
+    if backend != "files":
+        migrateFiles(directory, store)
+    return store
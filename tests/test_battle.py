@@ -0,0 +1,45 @@
+import sys
+import unittest
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from battle import Battle
+from combat import Creature, Combatant
+from server import StateServer
+
+def makeBattle(count):
+    battle = Battle()
+    for idx in range(count):
+        battle.addCreature(Combatant(Creature(f"Creature {idx}", 10, 12, idx, "enemy", 0)))
+    return battle
+
+class RemoveCreatureTest(unittest.TestCase):
+    def testRemovingCurrentLastRowEndsTheTurn(self):
+        battle = makeBattle(3)
+        for _ in range(3):
+            battle.newTurn()
+        self.assertEqual((battle.roundCounter, battle.turnCounter), (1, 2))
+        counters = (battle.roundCounter, battle.turnCounter)
+        battle.removeCreature(2)
+        self.assertIsNone(battle.current())
+        self.assertIsNone(StateServer().snapshot(battle)["turn"])
+        # nobody acts twice: the next turn opens round 2 with the first row
+        battle.newTurn()
+        self.assertEqual((battle.roundCounter, battle.turnCounter), (2, 0))
+        self.assertIs(battle.current(), battle.creatures[0])
+        battle.undo()
+        battle.undo()
+        self.assertEqual((battle.roundCounter, battle.turnCounter), counters)
+        self.assertEqual(len(battle.creatures), 3)
+
+    def testRemovingCurrentRowPassesTheTurnOn(self):
+        battle = makeBattle(3)
+        for _ in range(2):
+            battle.newTurn()
+        following = battle.creatures[2]
+        battle.removeCreature(1)
+        self.assertIs(battle.current(), following)
+
+if __name__ == "__main__":
+    unittest.main()
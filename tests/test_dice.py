@@ -0,0 +1,25 @@
+import sys
+import unittest
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from dice import MAXDICE, compileDice, isDice
+
+class CompileDiceTest(unittest.TestCase):
+    def testSpacesAroundSigns(self):
+        for text, low, high in (("8d6 + 3", 11, 51), (" d8 - 1 ", 0, 7), ("2d20kh1", 1, 20), ("12", 12, 12)):
+            expression = compileDice(text)
+            self.assertEqual((expression.minimum(), expression.maximum()), (low, high), text)
+
+    def testSpacesBetweenNumbersAreRejected(self):
+        for text in ("8d6 3", "1d20 1", "2 d6", "   "):
+            self.assertFalse(isDice(text), text)
+
+    def testTooManyDiceAreRejected(self):
+        self.assertTrue(isDice(f"{MAXDICE}d6"))
+        self.assertFalse(isDice(f"{MAXDICE + 1}d6"))
+        self.assertFalse(isDice(f"{MAXDICE}d6+1d6"))
+
+if __name__ == "__main__":
+    unittest.main()
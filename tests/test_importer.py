@@ -0,0 +1,51 @@
+import io
+import json
+import sys
+import unittest
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from importer import readJson
+
+MONSTERS = [{"name": f"Monster {idx}", "hit_points": 10 + idx, "armor_class": 12, "actions": [{"name": "Bite"}]} for idx in range(4)]
+CHUNKSIZES = (1, 7, 64, 1 << 16)
+
+def names(text, **options):
+    return [entry["name"] for entry in readJson(io.StringIO(text), **options)]
+
+class ReadJsonTest(unittest.TestCase):
+    def assertReadsMonsters(self, text):
+        for chunkSize in CHUNKSIZES:
+            self.assertEqual(names(text, chunkSize=chunkSize), [monster["name"] for monster in MONSTERS], chunkSize)
+
+    def testArray(self):
+        self.assertReadsMonsters(json.dumps(MONSTERS, indent=2))
+
+    def testWrapper(self):
+        self.assertReadsMonsters(json.dumps({"count": len(MONSTERS), "results": MONSTERS}, indent=2))
+
+    def testMinifiedWrapper(self):
+        self.assertReadsMonsters(json.dumps({"count": len(MONSTERS), "results": MONSTERS}))
+
+    def testWrapperKeyAfterOtherKeys(self):
+        self.assertReadsMonsters(json.dumps({"meta": {"source": "x" * 500}, "monsters": MONSTERS}))
+
+    def testOneObjectPerLine(self):
+        self.assertReadsMonsters("\n".join(json.dumps(monster) for monster in MONSTERS))
+
+    def testSingleObject(self):
+        self.assertEqual(names(json.dumps(MONSTERS[0], indent=2), chunkSize=7), ["Monster 0"])
+
+    def testOversizedEntryStops(self):
+        text = json.dumps({"bestiary": MONSTERS * 1000})
+        with self.assertRaises(ValueError):
+            names(text, chunkSize=256, maxEntry=4096)
+
+    def testTruncatedFile(self):
+        text = json.dumps(MONSTERS)[:-30]
+        with self.assertRaises(ValueError):
+            names(text, chunkSize=7)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import sys
+import tempfile
+import unittest
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from battle import Battle
+from combat import Creature, Combatant
+from journal import HEADER, HEALTH, AMOUNT, Journal, frame, loadJournal, readJournal
+
+def describe(battle):
+    return (battle.roundCounter, battle.turnCounter, [(creature.name, creature.HitPoints, creature.InititativeValue) for creature in battle.creatures])
+
+def playBattle(battle):
+    for idx in range(5):
+        battle.addCreature(Combatant(Creature(f"Goblin {idx}", 7 + idx, 13, idx - 2, ("enemy", "player", "NPC")[idx % 3], 0)))
+    for turn in range(12):
+        battle.newTurn()
+        if turn % 4 == 1:
+            battle.modifyHealth(turn % len(battle.creatures), -3)
+    battle.removeCreature(1)
+    battle.newRound()
+    battle.undo()
+    battle.undo()
+    battle.redo()
+
+class JournalTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.filePath = path.join(self.directory.name, "battle.journal")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def record(self, snapshotEvery=500):
+        battle = Battle()
+        journal = Journal(self.filePath, snapshotEvery)
+        journal.open(battle)
+        playBattle(battle)
+        journal.close()
+        return battle
+
+    def assertUndoRedoMatch(self, battle, restored):
+        # the restored log undoes and redoes back through the same states as the original
+        steps = 0
+        while battle.log.position:
+            battle.undo()
+            restored.undo()
+            steps += 1
+            self.assertEqual(describe(restored), describe(battle))
+        for _ in range(steps):
+            battle.redo()
+            restored.redo()
+            self.assertEqual(describe(restored), describe(battle))
+
+    def testRoundTrip(self):
+        battle = self.record()
+        restored = readJournal(self.filePath)
+        self.assertEqual(describe(restored), describe(battle))
+        self.assertEqual(restored.log.position, battle.log.position)
+        self.assertUndoRedoMatch(battle, restored)
+
+    def testRoundTripAcrossSnapshots(self):
+        battle = self.record(snapshotEvery=4)
+        restored = readJournal(self.filePath)
+        self.assertEqual(describe(restored), describe(battle))
+        self.assertEqual(restored.current().name, battle.current().name)
+
+    def testTornTailIsIgnored(self):
+        battle = self.record()
+        with open(self.filePath, "ab") as file:
+            file.write(frame(HEALTH, AMOUNT.pack(0, -5))[:HEADER.size + 3])
+        self.assertEqual(describe(readJournal(self.filePath)), describe(battle))
+
+    def testOutOfRangeCommandChangesNothing(self):
+        battle = Battle()
+        journal = Journal(self.filePath)
+        journal.open(battle)
+        battle.addCreature(Combatant(Creature("Ogre", 59, 11, -1, "enemy", 0)))
+        before = describe(battle)
+        seen = []
+        battle.listeners.append(seen.append)
+        with self.assertRaises(ValueError):
+            battle.modifyHealth(0, -3000000000)
+        self.assertEqual(describe(battle), before)
+        self.assertEqual(seen, [])
+        battle.modifyHealth(0, -5)
+        battle.undo()
+        journal.close()
+        restored = readJournal(self.filePath)
+        self.assertEqual(describe(restored), describe(battle))
+        self.assertEqual(restored.log.position, battle.log.position)
+
+    def testUnreplayableJournalIsMovedAside(self):
+        self.record()
+        with open(self.filePath, "ab") as file:
+            file.write(frame(HEALTH, AMOUNT.pack(999, -5)))  # a creature id the journal never wrote
+        self.assertIsNone(loadJournal(self.filePath))
+        self.assertFalse(path.exists(self.filePath))
+        self.assertTrue(path.exists(self.filePath + ".broken"))
+
+if __name__ == "__main__":
+    unittest.main()
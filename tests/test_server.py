@@ -0,0 +1,29 @@
+import socket
+import sys
+import unittest
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from battle import Battle
+from server import StateServer
+
+class StateServerTest(unittest.TestCase):
+    def testPortInUseRaisesFromStart(self):
+        with socket.socket() as held:
+            held.bind(("127.0.0.1", 0))
+            held.listen()
+            server = StateServer("127.0.0.1", held.getsockname()[1])
+            with self.assertRaises(OSError):
+                server.start()
+        server.publish(Battle())  # a server that never started ignores the battle
+        server.stop()
+
+    def testStopTwice(self):
+        server = StateServer("127.0.0.1", 0).start()
+        server.serveBattle(Battle())
+        server.stop()
+        server.stop()
+
+if __name__ == "__main__":
+    unittest.main()